@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+from fastapi import HTTPException, Response
+
+# Keyset pagination on the list endpoints (GET /suppliers, /ncs, /audit-log):
+# the body stays a plain list (offset clients keep working); the next page's after_id
+# is returned in this header, absent on the last page.
+NEXT_AFTER_ID_HEADER = "X-Next-After-Id"
+
+
+def check_page_params(offset: int, after_id: int | None) -> None:
+    if after_id is not None and offset:
+        raise HTTPException(status_code=400, detail="Use either offset or after_id")
+
+
+def set_next_after_id(response: Response, items: Sequence, limit: int) -> None:
+    # A full page may be followed by more rows (same rule as the dead-letter listing)
+    if len(items) == limit:
+        response.headers[NEXT_AFTER_ID_HEADER] = str(items[-1].id)
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+from datetime import datetime
 
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import check_page_params, set_next_after_id
 from app.auth import require_role
-from app.db import get_session
+from app.db import get_async_db
 from app.schemas import AuditLogOut
-from app.services.audit_service import list_audit_logs
+from app.services.audit_service import list_audit_logs_async
+from app.services.export_service import (
+    AUDIT_EXPORT_COLUMNS,
+    MEDIA_TYPES,
+    ExportFormat,
+    audit_export_query,
+    iter_export,
+)
 
 router = APIRouter(prefix="/audit-log", tags=["audit-log"])
 
@@ -15,9 +27,39 @@ router = APIRouter(prefix="/audit-log", tags=["audit-log"])
     response_model=list[AuditLogOut],
     dependencies=[Depends(require_role(["auditor", "admin"]))],
 )
-def get_audit_log(
+async def get_audit_log(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    after_id: int | None = Query(None, ge=0),
+    session: AsyncSession = Depends(get_async_db),
+):
+    check_page_params(offset, after_id)
+    items = await list_audit_logs_async(session, offset=offset, limit=limit, after_id=after_id)
+    set_next_after_id(response, items, limit)
+    return items
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(require_role(["auditor", "admin"]))],
+)
+def export_audit_log(
+    format: ExportFormat = Query("ndjson"),
+    entity_type: str | None = Query(None),
+    action: str | None = Query(None),
+    created_from: datetime | None = Query(None, description="created_at >= (ISO 8601, naive = UTC)"),
+    created_to: datetime | None = Query(None, description="created_at < (ISO 8601, naive = UTC)"),
 ):
-    with get_session() as session:
-        return list_audit_logs(session, offset=offset, limit=limit)
+    """Whole (filtered) audit trail in one streamed response, oldest first."""
+    q = audit_export_query(
+        entity_type=entity_type,
+        action=action,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    return StreamingResponse(
+        iter_export(q, AUDIT_EXPORT_COLUMNS, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="audit_log.{format}"'},
+    )
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.auth import require_role
+from app.db import get_session
+from app.schemas import DeadLetterPage, DeadLetterReplayIn, DeadLetterReplayOut
+from app.services.dead_letter_service import list_dead_letters, replay_dead_letters
+
+router = APIRouter(prefix="/admin/dead-letters", tags=["admin"])
+
+
+@router.get(
+    "",
+    response_model=DeadLetterPage,
+    dependencies=[Depends(require_role(["admin"]))],
+)
+def get_dead_letters(
+    limit: int = Query(50, ge=1, le=500),
+    after_id: int | None = Query(None, ge=0),
+    event_type: str | None = Query(None),
+    include_replayed: bool = Query(False),
+):
+    with get_session() as session:
+        items = list_dead_letters(
+            session,
+            after_id=after_id,
+            limit=limit,
+            event_type=event_type,
+            include_replayed=include_replayed,
+        )
+    next_after_id = items[-1].id if len(items) == limit else None
+    return {"items": items, "next_after_id": next_after_id}
+
+
+@router.post(
+    "/replay",
+    response_model=DeadLetterReplayOut,
+    dependencies=[Depends(require_role(["admin"]))],
+)
+def post_replay_dead_letters(payload: DeadLetterReplayIn):
+    try:
+        with get_session() as session:
+            replayed = replay_dead_letters(
+                session,
+                ids=payload.ids,
+                event_type=payload.event_type,
+                replay_all=payload.all,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"replayed": replayed}
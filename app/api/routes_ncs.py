@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import check_page_params, set_next_after_id
 from app.auth import require_role
-from app.db import get_session
+from app.db import get_async_db, get_session
 from app.schemas import NCCreate, NCOut
-from app.services.nc_service import close_nc, create_nc, list_ncs
+from app.services.export_service import MEDIA_TYPES, NC_EXPORT_COLUMNS, ExportFormat, iter_export, nc_export_query
+from app.services.nc_service import close_nc, create_nc, list_ncs_async
 
 
 router = APIRouter(prefix="/ncs", tags=["ncs"])
@@ -49,11 +55,50 @@ def patch_close_nc(nc_id: int):
     response_model=list[NCOut],
     dependencies=[Depends(require_role(["auditor", "procurement", "quality", "admin"]))],
 )
-def list_ncs_endpoint(
+async def list_ncs_endpoint(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    after_id: int | None = Query(None, ge=0),
+    status: str | None = Query(None),
+    severity: str | None = Query(None),
+    session: AsyncSession = Depends(get_async_db),
+):
+    check_page_params(offset, after_id)
+    items = await list_ncs_async(
+        session,
+        offset=offset,
+        limit=limit,
+        status=status,
+        severity=severity,
+        after_id=after_id,
+    )
+    set_next_after_id(response, items, limit)
+    return items
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(require_role(["auditor", "procurement", "quality", "admin"]))],
+)
+def export_ncs(
+    format: ExportFormat = Query("ndjson"),
     status: str | None = Query(None),
     severity: str | None = Query(None),
+    supplier_id: int | None = Query(None),
+    created_from: datetime | None = Query(None, description="created_at >= (ISO 8601, naive = UTC)"),
+    created_to: datetime | None = Query(None, description="created_at < (ISO 8601, naive = UTC)"),
 ):
-    with get_session() as session:
-        return list_ncs(session, offset=offset, limit=limit, status=status, severity=severity)
+    """All (filtered) nonconformities in one streamed response, by id."""
+    q = nc_export_query(
+        status=status,
+        severity=severity,
+        supplier_id=supplier_id,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    return StreamingResponse(
+        iter_export(q, NC_EXPORT_COLUMNS, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="nonconformities.{format}"'},
+    )
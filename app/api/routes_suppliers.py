@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import check_page_params, set_next_after_id
 from app.auth import require_role
-from app.db import get_session
+from app.db import get_async_db, get_session
 from app.schemas import SupplierCertUpdate, SupplierCreate, SupplierDetailOut, SupplierOut
 from app.services.supplier_service import (
     create_supplier,
-    get_supplier_detail,
+    get_supplier_detail_async,
+    get_supplier_details_async,
+    list_suppliers_async,
     update_supplier_certification,
-    list_suppliers,
 )
 
 
@@ -36,12 +41,37 @@ def post_supplier(payload: SupplierCreate):
     response_model=list[SupplierOut],
     dependencies=[Depends(require_role(["auditor", "quality", "procurement", "admin"]))],
 )
-def list_suppliers_endpoint(
+async def list_suppliers_endpoint(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    after_id: int | None = Query(None, ge=0),
+    expiring_before: date | None = Query(None, description="certification_expiry < this date (YYYY-MM-DD)"),
+    session: AsyncSession = Depends(get_async_db),
+):
+    check_page_params(offset, after_id)
+    items = await list_suppliers_async(
+        session,
+        offset=offset,
+        limit=limit,
+        expiring_before=expiring_before,
+        after_id=after_id,
+    )
+    set_next_after_id(response, items, limit)
+    return items
+
+
+@router.get(
+    "/details",
+    response_model=list[SupplierDetailOut],
+    dependencies=[Depends(require_role(["auditor", "quality", "procurement", "admin"]))],
+)
+async def get_suppliers_details(
+    ids: list[int] = Query(..., min_length=1, max_length=100),
+    session: AsyncSession = Depends(get_async_db),
 ):
-    with get_session() as session:
-        return list_suppliers(session, offset=offset, limit=limit)
+    """Detail/risk for many suppliers at once (list screens): ?ids=1&ids=2..."""
+    return await get_supplier_details_async(session, ids)
 
 
 @router.get(
@@ -49,10 +79,9 @@ def list_suppliers_endpoint(
     response_model=SupplierDetailOut,
     dependencies=[Depends(require_role(["auditor", "quality", "procurement", "admin"]))],
 )
-def get_supplier(supplier_id: int):
+async def get_supplier(supplier_id: int, session: AsyncSession = Depends(get_async_db)):
     try:
-        with get_session() as session:
-            return get_supplier_detail(session, supplier_id)
+        return await get_supplier_detail_async(session, supplier_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
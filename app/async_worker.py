@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import threading
+import time
+import uuid
+
+from app.db import dispose_async_engine, get_async_session
+from app.logging_utils import configure_logging, set_request_id
+from app.models import OutboxEvent
+from app.observability.outbox_health import start_health_sampler
+from app.observability.worker_tracing import setup_worker_tracing
+from app.settings import get_settings
+from app.worker import (
+    AdaptiveBatchController,
+    BatchResult,
+    _process_single_event,
+    claim_outbox_ids,
+    make_worker_id,
+    worker_poll_duration_seconds,
+    worker_poll_iterations_total,
+)
+
+
+logger = logging.getLogger("qhse.async_worker")
+
+
+async def _process_claimed(outbox_id: int, sem: asyncio.Semaphore, settings) -> int:
+    async with sem:
+        async with get_async_session() as session:
+            ev = await session.get(OutboxEvent, outbox_id)
+            if not ev or ev.status != "PROCESSING":
+                return 0
+
+            # Handlers are sync (Session API): run_sync keeps the DB I/O non-blocking
+            return await session.run_sync(lambda s: _process_single_event(s, ev, settings))
+
+
+async def run_batch_async(
+    limit: int | None = None,
+    *,
+    max_in_flight: int | None = None,
+    worker_id: str | None = None,
+) -> BatchResult:
+    """
+    Async counterpart of app.worker.run_batch.
+
+    The claim is the very same claim_outbox_ids (SKIP LOCKED) run in one AsyncSession;
+    claimed events are then processed concurrently, each in its own transaction,
+    with at most `max_in_flight` in flight.
+    """
+    t0 = time.time()
+
+    settings = get_settings()
+    batch = limit if limit is not None else settings.OUTBOX_BATCH_SIZE
+    if max_in_flight is None:
+        max_in_flight = settings.ASYNC_WORKER_MAX_IN_FLIGHT
+    if worker_id is None:
+        worker_id = make_worker_id()
+
+    set_request_id(f"worker:{uuid.uuid4()}")
+
+    try:
+        async with get_async_session() as session:
+            event_ids = await session.run_sync(
+                lambda s: claim_outbox_ids(
+                    s,
+                    limit=batch,
+                    worker_id=worker_id,
+                    lock_timeout_sec=settings.OUTBOX_LOCK_TIMEOUT_SEC,
+                )
+            )
+
+        sem = asyncio.Semaphore(max(1, max_in_flight))
+        results = await asyncio.gather(*(_process_claimed(i, sem, settings) for i in event_ids))
+        processed = sum(results)
+
+        duration_sec = time.time() - t0
+
+        if processed == 0:
+            worker_poll_iterations_total.labels(result="empty").inc()
+        else:
+            worker_poll_iterations_total.labels(result="ok").inc()
+
+        return BatchResult(claimed=len(event_ids), processed=processed, duration_sec=duration_sec)
+
+    finally:
+        worker_poll_duration_seconds.observe(time.time() - t0)
+        set_request_id(None)
+
+
+async def run_once_async(limit: int | None = None, *, max_in_flight: int | None = None) -> int:
+    return (await run_batch_async(limit, max_in_flight=max_in_flight)).processed
+
+
+async def worker_loop_async(stop: asyncio.Event, settings) -> None:
+    """Polling loop with the same adaptive batch size / idle backoff as the sync worker."""
+    worker_id = make_worker_id()
+    controller = AdaptiveBatchController.from_settings(settings)
+
+    logger.info("async worker loop starting", extra={"status": "starting", "worker_id": worker_id})
+
+    while not stop.is_set():
+        try:
+            result = await run_batch_async(controller.batch_size, worker_id=worker_id)
+        except Exception:
+            worker_poll_iterations_total.labels(result="error").inc()
+            raise
+
+        if result.processed:
+            logger.info("batch processed", extra={"status": "processed", "count": result.processed})
+
+        wait_sec = controller.observe(result)
+        if wait_sec <= 0:
+            continue
+
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=wait_sec)
+        except asyncio.TimeoutError:
+            pass
+
+    logger.info("async worker loop stopped", extra={"status": "stopped", "worker_id": worker_id})
+
+
+async def main_async() -> None:
+    settings = get_settings()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await worker_loop_async(stop, settings)
+    finally:
+        await dispose_async_engine()
+
+
+def main() -> None:
+    settings = get_settings()
+
+    configure_logging(level=settings.LOG_LEVEL, json_logs=settings.LOG_JSON)
+    setup_worker_tracing(enabled=settings.ENABLE_TRACING)
+
+    from os import getenv
+    from prometheus_client import start_http_server
+
+    metrics_port = int(getenv("WORKER_METRICS_PORT", "9100"))
+    start_http_server(metrics_port)
+    logger.info("worker metrics server started", extra={"port": metrics_port})
+
+    # sync sampler thread: health queries never compete with the event loop
+    health_stop = threading.Event()
+    start_health_sampler(health_stop, settings)
+    try:
+        asyncio.run(main_async())
+    finally:
+        health_stop.set()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,25 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 
 from app.logging_utils import get_request_id
+from app.models import AuditLog
+from app.settings import get_settings
+
+
+def _with_request_id(meta: dict[str, Any] | None) -> dict[str, Any]:
+    base: dict[str, Any] = dict(meta or {})
+
+    rid = get_request_id()
+    if rid and "request_id" not in base:
+        base["request_id"] = rid
+
+    return base
 
 
 def merge_audit_meta(meta: dict[str, Any] | None = None) -> str:
@@ -11,10 +27,55 @@ def merge_audit_meta(meta: dict[str, Any] | None = None) -> str:
     Merge provided meta with request_id (from contextvar) if missing.
     Return JSON string.
     """
-    base: dict[str, Any] = dict(meta or {})
+    return json.dumps(_with_request_id(meta), ensure_ascii=False)
 
-    rid = get_request_id()
-    if rid and "request_id" not in base:
-        base["request_id"] = rid
 
-    return json.dumps(base, ensure_ascii=False)
+_AUDIT_COLUMNS = ("actor", "action", "entity_type", "entity_id", "meta_json", "created_at")
+
+
+def write_audit_rows(
+    session: Session,
+    rows: Iterable[dict[str, Any]],
+    *,
+    copy_threshold: int | None = None,
+) -> int:
+    """
+    Bulk-insert audit rows given as plain dicts:
+    {"action", "entity_type", "entity_id", "meta": dict | None, "actor"="system"}.
+
+    Skips the AuditLog constructor: meta is merged with the request_id and serialized once.
+    Postgres with at least copy_threshold rows (default AUDIT_COPY_THRESHOLD): COPY FROM STDIN
+    on the session's connection (same transaction); otherwise, or on an async engine (run_sync:
+    the driver connection is a psycopg AsyncConnection), one executemany INSERT
+    (batched into multi-row VALUES by insertmanyvalues). Returns the number of rows written.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    records = [
+        (
+            row.get("actor") or "system",
+            row["action"],
+            row["entity_type"],
+            str(row["entity_id"]),
+            json.dumps(_with_request_id(row.get("meta")), ensure_ascii=False),
+            now,
+        )
+        for row in rows
+    ]
+    if not records:
+        return 0
+
+    if copy_threshold is None:
+        copy_threshold = get_settings().AUDIT_COPY_THRESHOLD
+
+    conn = session.connection()
+    use_copy = conn.dialect.name == "postgresql" and not conn.dialect.is_async
+    if use_copy and 0 < copy_threshold <= len(records):
+        cols = ", ".join(_AUDIT_COLUMNS)
+        with conn.connection.driver_connection.cursor() as cur:
+            with cur.copy(f"COPY audit_log ({cols}) FROM STDIN") as copy:
+                for record in records:
+                    copy.write_row(record)
+    else:
+        session.execute(insert(AuditLog), [dict(zip(_AUDIT_COLUMNS, record)) for record in records])
+
+    return len(records)
@@ -1,18 +1,33 @@
 # app/db.py
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Optional, cast
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Optional, cast
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.observability.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_pool
 from app.settings import get_settings
 
 _engine: Optional[Engine] = None
 _SessionLocal: Optional[sessionmaker] = None
 
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+
+def _pool_options(settings) -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SEC,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SEC,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 
 def _init_engine() -> None:
     """Initialize engine + sessionmaker once (lazy).
@@ -25,7 +40,13 @@ def _init_engine() -> None:
         return
 
     settings = get_settings()
-    _engine = create_engine(settings.DATABASE_URL, future=True)
+    _engine = create_engine(
+        settings.DATABASE_URL,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        **_pool_options(settings),
+    )
+    instrument_pool(_engine.pool, "sync")
 
     _SessionLocal = sessionmaker(
         bind=_engine,
@@ -91,3 +112,66 @@ def get_session():
         raise
     finally:
         session.close()
+
+
+def _init_async_engine() -> None:
+    """Async counterpart of _init_engine (lazy, once).
+
+    Same DATABASE_URL: the psycopg (v3) dialect serves both sync and async engines.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None and _AsyncSessionLocal is not None:
+        return
+
+    settings = get_settings()
+    _async_engine = create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        **_pool_options(settings),
+    )
+    instrument_pool(_async_engine.sync_engine.pool, "async")
+
+    _AsyncSessionLocal = async_sessionmaker(
+        bind=_async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+def get_async_engine() -> AsyncEngine:
+    _init_async_engine()
+    return cast(AsyncEngine, _async_engine)
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    _init_async_engine()
+    return cast(async_sessionmaker, _AsyncSessionLocal)
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (they are bound to the event loop that opened them)."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
+
+
+@asynccontextmanager
+async def get_async_session():
+    AsyncSessionLocal = get_async_sessionmaker()
+    session: AsyncSession = AsyncSessionLocal()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one AsyncSession per request (async read routes)."""
+    async with get_async_session() as session:
+        yield session
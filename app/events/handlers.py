@@ -1,49 +1,76 @@
 from __future__ import annotations
 
-import json
-from sqlalchemy.orm import Session
+from typing import Any
 
-from app.audit_utils import merge_audit_meta
-from app.models import AuditLog
+from sqlalchemy.orm import Session
 
+from app.audit_utils import write_audit_rows
+from app.events.projections import projection_buffer
+from app.events.registry import event_handler
+from app.events.supplier_stats import certification_changes, nc_closed_deltas, nc_created_deltas
 
-def handle_nc_created(session: Session, payload_json: str) -> None:
-    payload = json.loads(payload_json)
 
-    session.add(
-        AuditLog(
-            actor="system",
-            action="NC_CREATED_HANDLED",
-            entity_type="NonConformity",
-            entity_id=str(payload["nc_id"]),
-            meta_json=merge_audit_meta(payload),
-        )
+def _add_audit_rows(
+    session: Session,
+    payloads: list[dict[str, Any]],
+    *,
+    action: str,
+    entity_type: str,
+    id_field: str,
+) -> int:
+    # One bulk write for the whole batch; the payload is the audit meta
+    return write_audit_rows(
+        session,
+        (
+            {
+                "action": action,
+                "entity_type": entity_type,
+                "entity_id": payload[id_field],
+                "meta": payload,
+            }
+            for payload in payloads
+        ),
     )
 
 
-def handle_nc_closed(session: Session, payload_json: str) -> None:
-    payload = json.loads(payload_json)
-
-    session.add(
-        AuditLog(
-            actor="system",
-            action="NC_CLOSED_HANDLED",
-            entity_type="NonConformity",
-            entity_id=str(payload["nc_id"]),
-            meta_json=merge_audit_meta(payload),
-        )
+@event_handler("NC_CREATED")
+def handle_nc_created(session: Session, payloads: list[dict[str, Any]]) -> None:
+    # supplier_stats / kpi_snapshot are applied at commit (app.events.projections)
+    buffer = projection_buffer(session)
+    deltas = nc_created_deltas(session, payloads)  # before any write: a bad payload fails here
+    buffer.audit_events += _add_audit_rows(
+        session,
+        payloads,
+        action="NC_CREATED_HANDLED",
+        entity_type="NonConformity",
+        id_field="nc_id",
     )
+    buffer.add_stats(deltas)
 
 
-def handle_supplier_cert_updated(session: Session, payload_json: str) -> None:
-    payload = json.loads(payload_json)
+@event_handler("NC_CLOSED")
+def handle_nc_closed(session: Session, payloads: list[dict[str, Any]]) -> None:
+    buffer = projection_buffer(session)
+    deltas = nc_closed_deltas(session, payloads)  # before any write: a bad payload fails here
+    buffer.audit_events += _add_audit_rows(
+        session,
+        payloads,
+        action="NC_CLOSED_HANDLED",
+        entity_type="NonConformity",
+        id_field="nc_id",
+    )
+    buffer.add_stats(deltas)
+
 
-    session.add(
-        AuditLog(
-            actor="system",
-            action="SUPPLIER_CERT_UPDATED_HANDLED",
-            entity_type="Supplier",
-            entity_id=str(payload["supplier_id"]),
-            meta_json=merge_audit_meta(payload),
-        )
+@event_handler("SUPPLIER_CERT_UPDATED")
+def handle_supplier_cert_updated(session: Session, payloads: list[dict[str, Any]]) -> None:
+    buffer = projection_buffer(session)
+    certifications = certification_changes(session, payloads)
+    buffer.audit_events += _add_audit_rows(
+        session,
+        payloads,
+        action="SUPPLIER_CERT_UPDATED_HANDLED",
+        entity_type="Supplier",
+        id_field="supplier_id",
     )
+    buffer.certifications.update(certifications)
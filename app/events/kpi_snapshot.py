@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import logging
+
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db import get_session
+from app.events.supplier_stats import StatsChange, rebuild_supplier_stats, supplier_at_risk_clause
+from app.logging_utils import configure_logging
+from app.models import AuditLog, KpiSnapshot, SupplierStats
+from app.settings import get_settings
+
+
+logger = logging.getLogger("qhse.kpi_snapshot")
+
+SNAPSHOT_ID = 1
+
+# as_of_date of a freshly inserted row: always stale, so the first refresh fills it
+_NEVER = date(1970, 1, 1)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class KpiDelta:
+    nc_open: int = 0
+    nc_open_high: int = 0
+    nc_closed: int = 0
+    suppliers_at_risk: int = 0
+    audit_events_total: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def kpi_delta_for_stats_change(change: StatsChange) -> KpiDelta:
+    """KPI counters moved by what a transaction did to supplier_stats (see apply_stats_changes)."""
+    delta = KpiDelta()
+    for d in change.deltas.values():
+        delta.nc_open += d.nc_open
+        delta.nc_open_high += d.nc_open_high
+        delta.nc_closed += d.nc_total - d.nc_open
+    for before, after in change.at_risk.values():
+        delta.suppliers_at_risk += after - before
+    return delta
+
+
+def apply_kpi_delta(session: Session, delta: KpiDelta) -> None:
+    """
+    Add the delta to the snapshot row (one UPDATE). No row yet = nothing to do: the first
+    read builds it from the current state.
+
+    Every worker updates this one row: it is applied once per transaction, last, right before
+    commit (app.events.projections), so the row lock is held only for the commit.
+    """
+    values = {name: n for name, n in delta.as_dict().items() if n}
+    if not values:
+        return
+
+    session.execute(
+        update(KpiSnapshot)
+        .where(KpiSnapshot.id == SNAPSHOT_ID)
+        .values(
+            **{name: getattr(KpiSnapshot, name) + n for name, n in values.items()},
+            updated_at=utcnow(),
+        )
+    )
+
+
+def compute_kpi_counters(session: Session, today: date) -> dict[str, int]:
+    """
+    The snapshot counters, in one statement, from the projection the handlers maintain
+    (supplier_stats): a refresh and the deltas of in-flight events never count an NC or a
+    supplier twice.
+    """
+    nc_source = select(
+        func.coalesce(func.sum(SupplierStats.nc_open), 0).label("nc_open"),
+        func.coalesce(func.sum(SupplierStats.nc_open_high), 0).label("nc_open_high"),
+        func.coalesce(func.sum(SupplierStats.nc_total - SupplierStats.nc_open), 0).label("nc_closed"),
+    )
+    at_risk = select(func.count()).select_from(SupplierStats).where(supplier_at_risk_clause(today))
+
+    nc = nc_source.subquery()
+    row = session.execute(
+        select(
+            nc.c.nc_open,
+            nc.c.nc_open_high,
+            nc.c.nc_closed,
+            at_risk.scalar_subquery().label("suppliers_at_risk"),
+            select(func.count()).select_from(AuditLog).scalar_subquery().label("audit_events_total"),
+        )
+    ).one()
+
+    return {name: int(value) for name, value in row._mapping.items()}
+
+
+def refresh_kpi_snapshot(
+    session: Session,
+    *,
+    today: date | None = None,
+    only_if_stale: bool = False,
+) -> bool:
+    """
+    Recompute the snapshot row from supplier_stats. Returns False when only_if_stale and
+    another caller already refreshed it for `today`.
+
+    The row is locked (FOR UPDATE) before counting: handlers that commit before us are in the
+    counts, handlers still running wait on the row and apply their delta after us.
+    """
+    today = today or date.today()
+    now = utcnow()
+
+    session.execute(
+        pg_insert(KpiSnapshot)
+        .values(id=SNAPSHOT_ID, as_of_date=_NEVER, refreshed_at=now, updated_at=now)
+        .on_conflict_do_nothing(index_elements=[KpiSnapshot.id])
+    )
+    as_of_date = session.execute(
+        select(KpiSnapshot.as_of_date).where(KpiSnapshot.id == SNAPSHOT_ID).with_for_update()
+    ).scalar_one()
+
+    if only_if_stale and as_of_date == today:
+        return False
+
+    session.execute(
+        update(KpiSnapshot)
+        .where(KpiSnapshot.id == SNAPSHOT_ID)
+        .values(**compute_kpi_counters(session, today), as_of_date=today, refreshed_at=now, updated_at=now)
+    )
+    return True
+
+
+def main() -> None:
+    settings = get_settings()
+    configure_logging(level=settings.LOG_LEVEL, json_logs=settings.LOG_JSON)
+
+    # Reconcile: rebuild the projection from the source tables, then recount the snapshot from it
+    with get_session() as session:
+        rebuild_supplier_stats(session)
+        refresh_kpi_snapshot(session)
+        row = session.get(KpiSnapshot, SNAPSHOT_ID)
+        counters = {f.name: getattr(row, f.name) for f in fields(KpiDelta)}
+
+    logger.info("kpi snapshot refreshed: %s", counters, extra={"status": "done"})
+
+
+if __name__ == "__main__":
+    main()
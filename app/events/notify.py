@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import logging
+import time
+
+import psycopg
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.settings import get_settings
+
+
+OUTBOX_NOTIFY_CHANNEL = "outbox_events"
+
+logger = logging.getLogger("qhse.outbox.notify")
+
+
+def notify_outbox(session: Session) -> None:
+    """
+    Queue a NOTIFY on the outbox channel inside the current transaction.
+
+    Postgres delivers it only on commit (and collapses duplicates within the same tx),
+    so a rolled back business write never wakes the worker.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+
+    session.execute(text("SELECT pg_notify(:channel, '')"), {"channel": OUTBOX_NOTIFY_CHANNEL})
+
+
+def _psycopg_conninfo(database_url: str) -> str:
+    # SQLAlchemy URL (postgresql+psycopg://...) -> libpq URI
+    url = make_url(database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class OutboxListener:
+    """
+    Dedicated autocommit connection LISTENing on the outbox channel.
+
+    Lives outside the SQLAlchemy pool on purpose: it is held for the whole worker lifetime.
+    Connection errors are swallowed (and logged): wait() degrades to a plain sleep of `timeout`,
+    and the next call reconnects.
+    """
+
+    def __init__(self, database_url: str, channel: str = OUTBOX_NOTIFY_CHANNEL):
+        self._conninfo = _psycopg_conninfo(database_url)
+        self._channel = channel
+        self._conn: psycopg.Connection | None = None
+
+    @classmethod
+    def from_settings(cls) -> "OutboxListener":
+        return cls(get_settings().DATABASE_URL)
+
+    def _ensure_conn(self) -> psycopg.Connection:
+        if self._conn is None or self._conn.closed:
+            conn = psycopg.connect(self._conninfo, autocommit=True)
+            conn.execute(f'LISTEN "{self._channel}"')
+            self._conn = conn
+        return self._conn
+
+    def connect(self) -> "OutboxListener":
+        self._ensure_conn()
+        return self
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until a notification arrives or timeout expires.
+        Returns True if woken by a notification.
+        """
+        try:
+            conn = self._ensure_conn()
+
+            woken = False
+            for _ in conn.notifies(timeout=timeout, stop_after=1):
+                woken = True
+
+            if woken:
+                # coalesce notifications piled up while we were processing
+                for _ in conn.notifies(timeout=0):
+                    pass
+
+            return woken
+        except psycopg.Error:
+            logger.warning("outbox listener connection error; falling back to polling", exc_info=True)
+            self.close()
+            time.sleep(timeout)
+            return False
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
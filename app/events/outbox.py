@@ -7,11 +7,31 @@ from sqlalchemy.orm import Session
 
 from opentelemetry.propagate import inject
 
+from app.events.notify import notify_outbox
 from app.logging_utils import get_request_id
 from app.models import OutboxEvent
+from app.settings import get_settings
 
 
-def enqueue_event(session: Session, event_type: str, payload: dict) -> OutboxEvent:
+# Aggregate whose events must be applied in order, first match wins (NC events also carry supplier_id)
+PARTITION_KEY_FIELDS = (("nc_id", "nc"), ("supplier_id", "supplier"))
+
+
+def partition_key_for(payload: dict) -> str | None:
+    for field, prefix in PARTITION_KEY_FIELDS:
+        value = payload.get(field)
+        if value is not None:
+            return f"{prefix}:{value}"
+    return None
+
+
+def enqueue_event(
+    session: Session,
+    event_type: str,
+    payload: dict,
+    *,
+    partition_key: str | None = None,
+) -> OutboxEvent:
     rid = get_request_id()
 
     # keep business payload intact + optional request_id for downstream/audit
@@ -37,6 +57,12 @@ def enqueue_event(session: Session, event_type: str, payload: dict) -> OutboxEve
         meta_json=json.dumps(meta, ensure_ascii=False),
         status="PENDING",
         attempts=0,
+        partition_key=partition_key or partition_key_for(payload),
     )
     session.add(ev)
+
+    # wake up LISTENing workers once this transaction commits
+    if get_settings().OUTBOX_NOTIFY_ENABLED:
+        notify_outbox(session)
+
     return ev
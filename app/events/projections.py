@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.events.kpi_snapshot import apply_kpi_delta, kpi_delta_for_stats_change
+from app.events.supplier_stats import StatsDelta, apply_stats_changes
+
+
+# Read models updated by the event handlers (supplier_stats, kpi_snapshot).
+#
+# Handlers do not write them: they add their deltas to a buffer on the session, and the buffer
+# is applied once, when the transaction commits (supplier_stats rows in supplier_id order, then
+# the kpi_snapshot row). A worker transaction therefore locks projection rows in one global
+# order and holds the shared kpi_snapshot row only for the commit, whatever the batch size.
+# The buffer is applied outside the events' SAVEPOINTs, so handlers reject what would make it
+# fail (e.g. an unknown supplier_id) before adding to it, while the failure policy still applies.
+
+_BUFFERS_KEY = "projection_buffers"
+
+
+@dataclass
+class ProjectionBuffer:
+    stats: dict[int, StatsDelta] = field(default_factory=dict)
+    certifications: dict[int, date | None] = field(default_factory=dict)  # latest expiry per supplier
+    audit_events: int = 0
+
+    def add_stats(self, deltas: dict[int, StatsDelta]) -> None:
+        for supplier_id, d in deltas.items():
+            self.stats.setdefault(supplier_id, StatsDelta()).add(d)
+
+    def merge(self, other: ProjectionBuffer) -> None:
+        self.add_stats(other.stats)
+        self.certifications.update(other.certifications)
+        self.audit_events += other.audit_events
+
+
+def _buffers(session: Session) -> list[ProjectionBuffer]:
+    return session.info.setdefault(_BUFFERS_KEY, [ProjectionBuffer()])
+
+
+def projection_buffer(session: Session) -> ProjectionBuffer:
+    """The buffer the running handler adds to (the innermost projection_scope)."""
+    return _buffers(session)[-1]
+
+
+@contextmanager
+def projection_scope(session: Session) -> Iterator[None]:
+    """
+    Keep the deltas added inside the block apart: merged into the enclosing buffer if it
+    succeeds, dropped if it raises. Every SAVEPOINT around handlers goes inside one, so an
+    event rolled back to its savepoint leaves no delta behind.
+    """
+    buffers = _buffers(session)
+    buffers.append(ProjectionBuffer())
+    try:
+        yield
+    except BaseException:
+        buffers.pop()
+        raise
+    inner = buffers.pop()
+    buffers[-1].merge(inner)
+
+
+def apply_projections(session: Session, buffer: ProjectionBuffer) -> None:
+    """supplier_stats first (rows locked in supplier_id order), kpi_snapshot last."""
+    kpi = kpi_delta_for_stats_change(apply_stats_changes(session, buffer.stats, buffer.certifications))
+    kpi.audit_events_total += buffer.audit_events
+    apply_kpi_delta(session, kpi)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_before_commit(session: Session) -> None:
+    # also fired when a SAVEPOINT is released: only the real commit applies the buffer
+    if session.in_nested_transaction():
+        return
+    buffers = session.info.pop(_BUFFERS_KEY, None)
+    if buffers:
+        session.flush()  # pending ORM writes (outbox rows) go before the projection rows are locked
+        apply_projections(session, buffers[0])
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_on_rollback(session: Session, transaction: SessionTransaction) -> None:
+    # committed: already popped by _apply_before_commit; rolled back / closed: discard
+    if transaction.parent is None:
+        session.info.pop(_BUFFERS_KEY, None)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+
+# A handler receives the decoded payloads of every claimed event of its type
+# (a single event is a batch of one) and applies their effects in the caller's transaction.
+BatchHandler = Callable[[Session, list[dict[str, Any]]], None]
+
+_REGISTRY: dict[str, BatchHandler] = {}
+
+
+def event_handler(event_type: str) -> Callable[[BatchHandler], BatchHandler]:
+    """
+    Register the decorated function as the batch handler for event_type.
+
+        @event_handler("NC_CREATED")
+        def handle_nc_created(session, payloads): ...
+    """
+
+    def decorator(fn: BatchHandler) -> BatchHandler:
+        current = _REGISTRY.get(event_type)
+        if current is not None and current is not fn:
+            raise ValueError(f"Handler already registered for event_type: {event_type}")
+        _REGISTRY[event_type] = fn
+        return fn
+
+    return decorator
+
+
+def get_handler(event_type: str) -> BatchHandler:
+    try:
+        return _REGISTRY[event_type]
+    except KeyError:
+        raise ValueError(f"Unknown event_type: {event_type}") from None
+
+
+def registered_event_types() -> frozenset[str]:
+    return frozenset(_REGISTRY)
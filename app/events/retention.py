@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import logging
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.db import get_session
+from app.logging_utils import configure_logging
+from app.models import OutboxEvent, OutboxEventArchive, ProcessedEvent
+from app.settings import get_settings
+
+
+logger = logging.getLogger("qhse.outbox.retention")
+
+_ARCHIVED_COLUMNS = [c.name for c in OutboxEventArchive.__table__.columns if c.name != "archived_at"]
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def archive_done_events(session: Session, *, older_than: datetime, batch_size: int) -> int:
+    """
+    Move up to batch_size DONE events created before older_than into outbox_events_archive.
+
+    One statement (Postgres): DELETE ... RETURNING inside a CTE feeding the archive INSERT,
+    so a row is never in both tables or in neither. SKIP LOCKED keeps it off rows a worker holds.
+    """
+    batch_ids = (
+        select(OutboxEvent.id)
+        .where(OutboxEvent.status == "DONE", OutboxEvent.created_at < older_than)
+        .order_by(OutboxEvent.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    outbox = OutboxEvent.__table__
+    moved = (
+        delete(OutboxEvent)
+        .where(OutboxEvent.id.in_(batch_ids))
+        .returning(*(outbox.c[name] for name in _ARCHIVED_COLUMNS))
+        .cte("moved")
+    )
+
+    archived_at = literal(utcnow(), OutboxEventArchive.archived_at.type)
+    stmt = insert(OutboxEventArchive).from_select(
+        [*_ARCHIVED_COLUMNS, "archived_at"],
+        select(*(moved.c[name] for name in _ARCHIVED_COLUMNS), archived_at),
+    ).returning(OutboxEventArchive.id)
+    return len(session.execute(stmt).all())
+
+
+def prune_processed_events(session: Session, *, older_than: datetime, batch_size: int) -> int:
+    """
+    Delete up to batch_size processed_events rows older than older_than.
+
+    Rows whose event is still in the hot outbox table are kept: as long as the event can be
+    claimed again (reclaim, replay), its dedup record must survive.
+    """
+    still_live = select(OutboxEvent.id).where(OutboxEvent.event_id == ProcessedEvent.event_id)
+
+    batch_ids = (
+        select(ProcessedEvent.id)
+        .where(ProcessedEvent.processed_at < older_than, ~exists(still_live))
+        .order_by(ProcessedEvent.id.asc())
+        .limit(batch_size)
+    )
+
+    return session.execute(delete(ProcessedEvent).where(ProcessedEvent.id.in_(batch_ids))).rowcount
+
+
+def run_retention(settings=None, *, now: datetime | None = None) -> dict[str, int]:
+    """
+    Archive old DONE outbox events, then prune processed_events, in bounded batches
+    (one transaction per batch, so locks are short and progress is kept on failure).
+    """
+    settings = settings or get_settings()
+    now = now or utcnow()
+    batch_size = settings.RETENTION_BATCH_SIZE
+
+    # The idempotency window can never be shorter than the hot outbox window
+    processed_days = settings.PROCESSED_EVENTS_RETENTION_DAYS
+    if processed_days < settings.OUTBOX_RETENTION_DAYS:
+        logger.warning(
+            "PROCESSED_EVENTS_RETENTION_DAYS < OUTBOX_RETENTION_DAYS; using the outbox window",
+        )
+        processed_days = settings.OUTBOX_RETENTION_DAYS
+
+    totals = {"archived": 0, "processed_pruned": 0}
+
+    outbox_cutoff = now - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    while True:
+        with get_session() as session:
+            n = archive_done_events(session, older_than=outbox_cutoff, batch_size=batch_size)
+        totals["archived"] += n
+        if n < batch_size:
+            break
+
+    processed_cutoff = now - timedelta(days=processed_days)
+    while True:
+        with get_session() as session:
+            n = prune_processed_events(session, older_than=processed_cutoff, batch_size=batch_size)
+        totals["processed_pruned"] += n
+        if n < batch_size:
+            break
+
+    logger.info(
+        "outbox retention done: outbox archived=%d processed_events pruned=%d",
+        totals["archived"],
+        totals["processed_pruned"],
+        extra={
+            "status": "done",
+            "archived": totals["archived"],
+            "processed_pruned": totals["processed_pruned"],
+        },
+    )
+    return totals
+
+
+def main() -> None:
+    settings = get_settings()
+    configure_logging(level=settings.LOG_LEVEL, json_logs=settings.LOG_JSON)
+
+    run_retention(settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import logging
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import ColumnElement, Integer, Select, cast, delete, func, insert, literal, or_, select, text, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db import get_session
+from app.logging_utils import configure_logging
+from app.models import NonConformity, OutboxEvent, Supplier, SupplierStats
+from app.settings import get_settings
+
+
+logger = logging.getLogger("qhse.supplier_stats")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# --- "Supplier at risk" = certification expired OR at least one OPEN high NC ---
+# One definition for GET /kpi (suppliers_at_risk) and GET /suppliers/{id} (is_at_risk).
+
+
+def cert_expired_clause(today: date, *, from_stats: bool = False) -> ColumnElement[bool]:
+    # DATE column (NULL = no certification, never expired); suppliers: range on ix_suppliers_certification_expiry
+    column = SupplierStats.certification_expiry if from_stats else Supplier.certification_expiry
+    return column < today
+
+
+def supplier_at_risk_clause(today: date, *, live_certification: bool = False) -> ColumnElement[bool]:
+    """
+    Per-supplier risk predicate, in SQL, on supplier_stats (the query must select from it or
+    outer-join it): certification as applied by the handlers + nc_open_high; no row = not at risk.
+
+    live_certification=True takes the certification from suppliers instead, for responses
+    that also return suppliers.certification_expiry (the query joins both).
+    """
+    cert_expired_now = cert_expired_clause(today, from_stats=not live_certification)
+    return or_(cert_expired_now, func.coalesce(SupplierStats.nc_open_high, 0) > 0)
+
+
+def payload_date(value: date | str | None) -> date | None:
+    # event payloads carry ISO strings; older events may hold "" or a non-date (as the migration: NULL)
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return None
+    return value
+
+
+def cert_expired(certification_expiry: date | str | None, today: date) -> bool:
+    """Python twin of cert_expired_clause."""
+    certification_expiry = payload_date(certification_expiry)
+    return certification_expiry is not None and certification_expiry < today
+
+
+def supplier_at_risk(certification_expiry: date | None, nc_open_high: int, today: date) -> bool:
+    """Python twin of supplier_at_risk_clause."""
+    return cert_expired(certification_expiry, today) or nc_open_high > 0
+
+
+@dataclass
+class StatsDelta:
+    nc_total: int = 0
+    nc_open: int = 0
+    nc_open_high: int = 0
+    last_nc_at: datetime | None = None
+
+    def add(self, other: StatsDelta) -> None:
+        self.nc_total += other.nc_total
+        self.nc_open += other.nc_open
+        self.nc_open_high += other.nc_open_high
+        if other.last_nc_at is not None and (self.last_nc_at is None or other.last_nc_at > self.last_nc_at):
+            self.last_nc_at = other.last_nc_at
+
+
+def certification_changes(session: Session, payloads: list[dict[str, Any]]) -> dict[int, date | None]:
+    """
+    Latest certification_expiry per supplier in a batch of certification events (payload order).
+
+    The supplier_stats row is written at commit, outside the event's SAVEPOINT: an event for an
+    unknown supplier is rejected here, while it can still go through the failure policy.
+    """
+    changes = {int(p["supplier_id"]): payload_date(p.get("certification_expiry")) for p in payloads}
+    known = set(session.execute(select(Supplier.id).where(Supplier.id.in_(changes))).scalars())
+    unknown = sorted(set(changes) - known)
+    if unknown:
+        raise ValueError(f"Unknown supplier_id: {unknown}")
+    return changes
+
+
+def _load_ncs(session: Session, payloads: list[dict[str, Any]]):
+    """The NC rows behind a batch of NC events (source of truth for supplier, severity, created_at)."""
+    nc_ids = {int(p["nc_id"]) for p in payloads}
+    rows = session.execute(
+        select(NonConformity.id, NonConformity.supplier_id, NonConformity.severity, NonConformity.created_at)
+        .where(NonConformity.id.in_(nc_ids))
+    ).all()
+    return {row.id: row for row in rows}
+
+
+@dataclass
+class StatsChange:
+    """What a transaction did to supplier_stats: the NC deltas applied, and "at risk" before/after per supplier."""
+
+    deltas: dict[int, StatsDelta]
+    at_risk: dict[int, tuple[bool, bool]]
+
+
+def apply_stats_changes(
+    session: Session,
+    deltas: dict[int, StatsDelta],
+    certifications: dict[int, date | None],
+    *,
+    today: date | None = None,
+) -> StatsChange:
+    """
+    Apply NC counter deltas and certification changes to supplier_stats.
+
+    Called once per transaction, right before commit (app.events.projections), with the changes
+    of the whole batch. The rows are first locked in supplier_id order (created if missing) by
+    one upsert that returns their current state, so concurrent workers touching the same
+    suppliers always lock them in the same order (no deadlocks) and "at risk" before/after is
+    computed from the row itself: NC and certification events of a supplier are applied one
+    after the other to the same state, whatever order the worker handles them in.
+    """
+    supplier_ids = sorted(set(deltas) | set(certifications))
+    if not supplier_ids:
+        return StatsChange(deltas={}, at_risk={})
+
+    today = today or date.today()
+    now = utcnow()
+
+    lock = pg_insert(SupplierStats).values(
+        [
+            {"supplier_id": supplier_id, "nc_total": 0, "nc_open": 0, "nc_open_high": 0, "updated_at": now}
+            for supplier_id in supplier_ids
+        ]
+    )
+    # no-op update: locks an existing row and returns it as it is
+    lock = lock.on_conflict_do_update(
+        index_elements=[SupplierStats.supplier_id],
+        set_={"updated_at": lock.excluded.updated_at},
+    ).returning(
+        SupplierStats.supplier_id,
+        SupplierStats.nc_total,
+        SupplierStats.nc_open,
+        SupplierStats.nc_open_high,
+        SupplierStats.last_nc_at,
+        SupplierStats.certification_expiry,
+    )
+
+    rows: list[dict[str, Any]] = []
+    at_risk: dict[int, tuple[bool, bool]] = {}
+    for row in session.execute(lock):
+        d = deltas.get(row.supplier_id, StatsDelta())
+        expiry = certifications.get(row.supplier_id, row.certification_expiry)
+        nc_open_high = row.nc_open_high + d.nc_open_high
+
+        last_nc_at = row.last_nc_at
+        if d.last_nc_at is not None and (last_nc_at is None or d.last_nc_at > last_nc_at):
+            last_nc_at = d.last_nc_at
+
+        rows.append(
+            {
+                "supplier_id": row.supplier_id,
+                "nc_total": row.nc_total + d.nc_total,
+                "nc_open": row.nc_open + d.nc_open,
+                "nc_open_high": nc_open_high,
+                "last_nc_at": last_nc_at,
+                "certification_expiry": expiry,
+                "updated_at": now,
+            }
+        )
+        at_risk[row.supplier_id] = (
+            supplier_at_risk(row.certification_expiry, row.nc_open_high, today),
+            supplier_at_risk(expiry, nc_open_high, today),
+        )
+
+    # bulk UPDATE by primary key (executemany)
+    session.execute(update(SupplierStats), rows)
+    return StatsChange(deltas=deltas, at_risk=at_risk)
+
+
+def nc_created_deltas(session: Session, payloads: list[dict[str, Any]]) -> dict[int, StatsDelta]:
+    deltas: dict[int, StatsDelta] = {}
+    for nc in _load_ncs(session, payloads).values():
+        d = deltas.setdefault(nc.supplier_id, StatsDelta())
+        d.nc_total += 1
+        d.nc_open += 1
+        d.nc_open_high += nc.severity == "high"
+        if d.last_nc_at is None or nc.created_at > d.last_nc_at:
+            d.last_nc_at = nc.created_at
+
+    return deltas
+
+
+def nc_closed_deltas(session: Session, payloads: list[dict[str, Any]]) -> dict[int, StatsDelta]:
+    # Only an OPEN -> CLOSED transition moves the counters (re-closing is a no-op).
+    # Events enqueued before previous_status existed are treated as transitions.
+    closed = [p for p in payloads if p.get("previous_status", "OPEN") == "OPEN"]
+    if not closed:
+        return {}
+
+    deltas: dict[int, StatsDelta] = {}
+    for nc in _load_ncs(session, closed).values():
+        d = deltas.setdefault(nc.supplier_id, StatsDelta())
+        d.nc_open -= 1
+        d.nc_open_high -= nc.severity == "high"
+
+    return deltas
+
+
+def _live_nc_event_ids(event_type: str) -> Select:
+    """nc_id of the NC events of that type a worker has not applied yet (PENDING/PROCESSING)."""
+    payload = cast(OutboxEvent.payload_json, JSONB)
+    q = select(cast(payload["nc_id"].astext, Integer)).where(
+        OutboxEvent.status.in_(("PENDING", "PROCESSING")),
+        OutboxEvent.event_type == event_type,
+    )
+    if event_type == "NC_CLOSED":
+        # same rule as nc_closed_deltas: only a transition will move the counters
+        q = q.where(func.coalesce(payload["previous_status"].astext, "OPEN") == "OPEN")
+    return q
+
+
+def rebuild_supplier_stats(session: Session) -> int:
+    """
+    Recompute supplier_stats from suppliers + nonconformities (delete + one INSERT ... SELECT):
+    one row per supplier. Returns the number of rows written.
+
+    The rows are counted as the handlers will have left them: an NC whose NC_CREATED is still
+    live is left out (its handler adds it), an NC whose NC_CLOSED is still live counts as OPEN
+    (its handler closes it). The certification is copied as it is now (a live certification
+    event sets it again). The table lock makes running handlers wait for the rebuild, so an
+    event is either DONE before our snapshot or applied on top of the rebuilt rows.
+    """
+    is_open = or_(NonConformity.status == "OPEN", NonConformity.id.in_(_live_nc_event_ids("NC_CLOSED")))
+    ncs = (
+        select(
+            NonConformity.supplier_id,
+            func.count().label("nc_total"),
+            func.count().filter(is_open).label("nc_open"),
+            func.count().filter(is_open, NonConformity.severity == "high").label("nc_open_high"),
+            func.max(NonConformity.created_at).label("last_nc_at"),
+        )
+        .where(NonConformity.id.not_in(_live_nc_event_ids("NC_CREATED")))
+        .group_by(NonConformity.supplier_id)
+        .subquery()
+    )
+
+    # EXCLUSIVE: conflicts with the handlers' upserts, not with plain reads (GET /suppliers/{id})
+    session.execute(text("LOCK TABLE supplier_stats IN EXCLUSIVE MODE"))
+    session.execute(delete(SupplierStats))
+
+    stmt = insert(SupplierStats).from_select(
+        ["supplier_id", "nc_total", "nc_open", "nc_open_high", "last_nc_at", "certification_expiry", "updated_at"],
+        select(
+            Supplier.id,
+            func.coalesce(ncs.c.nc_total, 0),
+            func.coalesce(ncs.c.nc_open, 0),
+            func.coalesce(ncs.c.nc_open_high, 0),
+            ncs.c.last_nc_at,
+            Supplier.certification_expiry,
+            literal(utcnow(), SupplierStats.updated_at.type),
+        ).outerjoin(ncs, ncs.c.supplier_id == Supplier.id),
+    ).returning(SupplierStats.supplier_id)
+
+    return len(session.execute(stmt).all())
+
+
+def main() -> None:
+    settings = get_settings()
+    configure_logging(level=settings.LOG_LEVEL, json_logs=settings.LOG_JSON)
+
+    with get_session() as session:
+        n = rebuild_supplier_stats(session)
+
+    logger.info("supplier stats rebuilt", extra={"status": "done", "count": n})
+
+
+if __name__ == "__main__":
+    main()
@@ -49,7 +49,17 @@ class JsonFormatter(logging.Formatter):
             payload["request_id"] = rid
 
         # Common extras (safe if missing)
-        for key in ("event_type", "outbox_id", "event_id", "status", "attempts"):
+        for key in (
+            "event_type",
+            "outbox_id",
+            "event_id",
+            "status",
+            "attempts",
+            "worker_id",
+            "count",
+            "archived",
+            "processed_pruned",
+        ):
             val = getattr(record, key, None)
             if val is not None:
                 payload[key] = val
@@ -4,6 +4,7 @@ import logging
 import uuid
 import time
 
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, Callable, Optional
 
@@ -30,8 +31,9 @@ from app.api.routes_ncs import router as ncs_router
 from app.api.routes_kpi import router as kpi_router
 from app.api.routes_auth import router as auth_router
 from app.api.routes_audit_log import router as audit_log_router
+from app.api.routes_dead_letters import router as dead_letters_router
 
-from app.db import get_session
+from app.db import dispose_async_engine, get_session
 
 from app.logging_utils import configure_logging
 from app.settings import get_settings
@@ -54,12 +56,20 @@ HTTP_REQUEST_DURATION_SECONDS = Histogram(
 REQUEST_ID_HEADER = "X-Request-Id"
 
 
-app = FastAPI(title="QHSE Supply Chain - Demo")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    # async pooled connections are bound to this event loop
+    await dispose_async_engine()
+
+
+app = FastAPI(title="QHSE Supply Chain - Demo", lifespan=lifespan)
 app.include_router(suppliers_router)
 app.include_router(kpi_router)
 app.include_router(ncs_router)
 app.include_router(auth_router)
 app.include_router(audit_log_router)
+app.include_router(dead_letters_router)
 
 settings = get_settings()
 init_tracing(app, enabled=settings.ENABLE_TRACING)
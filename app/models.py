@@ -1,17 +1,20 @@
 # app/models.py
 from __future__ import annotations
 
-from datetime import datetime, UTC
+from datetime import date, datetime, UTC
 from typing import Optional
 import json
 
 from sqlalchemy import (
+    BigInteger,
+    Date,
     DateTime,
     ForeignKey,
     Integer,
     String,
     Text,
     Index,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -47,11 +50,16 @@ class Supplier(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False, unique=True)
 
-    certification_expiry: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    certification_expiry: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
 
     ncs: Mapped[list["NonConformity"]] = relationship(back_populates="supplier")
 
+    __table_args__ = (
+        # expiry filters (expired / expiring_before) are range scans
+        Index("ix_suppliers_certification_expiry", "certification_expiry"),
+    )
+
 
 class NonConformity(Base):
     __tablename__ = "nonconformities"
@@ -73,6 +81,47 @@ class NonConformity(Base):
     )
 
 
+class SupplierStats(Base):
+    """
+    Per-supplier read model: NC counters and the certification expiry as applied by the event
+    handlers (app.events.supplier_stats), rebuilt from suppliers + nonconformities by its
+    reconcile job. "At risk" for GET /kpi is computed from this row only.
+    """
+
+    __tablename__ = "supplier_stats"
+
+    supplier_id: Mapped[int] = mapped_column(ForeignKey("suppliers.id"), primary_key=True)
+
+    nc_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    nc_open: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    nc_open_high: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_nc_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    certification_expiry: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+
+
+class KpiSnapshot(Base):
+    """
+    Single-row (id=1) read model for GET /kpi, kept current by the outbox handlers and
+    recomputed by app.events.kpi_snapshot (daily, since certifications expire by date).
+    """
+
+    __tablename__ = "kpi_snapshot"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+
+    nc_open: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    nc_open_high: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    nc_closed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    suppliers_at_risk: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    audit_events_total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    as_of_date: Mapped[date] = mapped_column(Date, nullable=False)  # "today" used for certification expiry
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # last full recompute
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+
+
 class OutboxEvent(Base):
     __tablename__ = "outbox_events"
 
@@ -91,13 +140,53 @@ class OutboxEvent(Base):
     locked_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
+    # Retry backoff: a PENDING event is claimable only once this is NULL or in the past
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # JSON list of failed attempts ({attempt, at, error, traceback_digest}); copied to the dead letter
+    error_history_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Aggregate the event belongs to ("nc:12", "supplier:3"): events sharing it are claimed in id order,
+    # one at a time. NULL = unordered.
+    partition_key: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
     processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     __table_args__ = (
         Index("ix_outbox_status", "status"),
         Index("ix_outbox_created_at", "created_at"),
-        Index("ix_outbox_status_locked_at", "status", "locked_at"),
+        # Claim branches (see app.worker.build_claim_query): only live rows are indexed
+        Index(
+            "ix_outbox_claim_pending",
+            "id",
+            postgresql_where=text("status = 'PENDING' AND next_attempt_at IS NULL"),
+        ),
+        Index(
+            "ix_outbox_claim_retry",
+            "next_attempt_at",
+            "id",
+            postgresql_where=text("status = 'PENDING' AND next_attempt_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_outbox_claim_processing",
+            "id",
+            "locked_at",
+            postgresql_where=text("status = 'PROCESSING'"),
+        ),
+        # Health sampler: count + min(created_at) over the (small) unprocessed set only
+        Index(
+            "ix_outbox_unprocessed_created_at",
+            "created_at",
+            postgresql_where=text("status IN ('PENDING', 'PROCESSING')"),
+        ),
+        # Ordered claim: "is there an older live event in my partition?" lookup
+        Index(
+            "ix_outbox_partition_live",
+            "partition_key",
+            "id",
+            postgresql_where=text("status IN ('PENDING', 'PROCESSING') AND partition_key IS NOT NULL"),
+        ),
     )
 
     def __init__(self, **kwargs):
@@ -119,6 +208,78 @@ class OutboxEvent(Base):
         super().__init__(**kwargs)
 
 
+class OutboxEventArchive(Base):
+    """
+    DONE outbox events moved out of the hot table by app.events.retention.
+    Same columns as OutboxEvent (original id kept), plus archived_at.
+    """
+
+    __tablename__ = "outbox_events_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+
+    event_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload_json: Mapped[str] = mapped_column(Text, nullable=False)
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    meta_json: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+
+    locked_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    error_history_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    partition_key: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+
+    __table_args__ = (
+        Index("ix_outbox_archive_event_id", "event_id"),
+        Index("ix_outbox_archive_created_at", "created_at"),
+    )
+
+
+class DeadLetterEvent(Base):
+    """
+    Outbox events that exhausted OUTBOX_MAX_ATTEMPTS, moved out of outbox_events by the worker.
+    Replay re-enqueues them (same event_id) and stamps replayed_at.
+    """
+
+    __tablename__ = "outbox_dead_letters"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    outbox_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    event_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload_json: Mapped[str] = mapped_column(Text, nullable=False)
+    meta_json: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+    partition_key: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_error: Mapped[str] = mapped_column(Text, nullable=False)
+    traceback_digest: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    attempt_history_json: Mapped[str] = mapped_column(Text, nullable=False, default="[]")
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # original enqueue time
+    failed_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    replayed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_dead_letters_event_id", "event_id"),
+        Index("ix_dead_letters_event_type_id", "event_type", "id"),
+        Index(
+            "ix_dead_letters_unreplayed",
+            "id",
+            postgresql_where=text("replayed_at IS NULL"),
+        ),
+    )
+
+
 class AuditLog(Base):
     __tablename__ = "audit_log"
 
@@ -160,4 +321,7 @@ class ProcessedEvent(Base):
     event_id: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
     processed_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
 
-    __table_args__ = (Index("ix_processed_event_id", "event_id"),)
+    __table_args__ = (
+        Index("ix_processed_event_id", "event_id"),
+        Index("ix_processed_processed_at", "processed_at"),
+    )
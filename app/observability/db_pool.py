@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import time
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+# --- Connection pool metrics (label engine = sync | async) ---
+db_pool_checked_out_connections = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the SQLAlchemy pool",
+    ["engine"],
+)
+
+db_pool_idle_connections = Gauge(
+    "db_pool_idle_connections",
+    "Idle connections held by the SQLAlchemy pool",
+    ["engine"],
+)
+
+db_pool_overflow_connections = Gauge(
+    "db_pool_overflow_connections",
+    "Connections opened beyond pool_size (negative: pool not yet full)",
+    ["engine"],
+)
+
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to obtain a connection from the pool (queueing + connect on a cold slot)",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class _TimedCheckoutMixin:
+    """Times QueuePool._do_get, where a checkout waits for a free slot (up to pool_timeout)."""
+
+    metrics_label = "sync"
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait_seconds.labels(engine=self.metrics_label).observe(time.perf_counter() - t0)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+def instrument_pool(pool: Pool, label: str) -> None:
+    """Export pool occupancy as gauges, read from the pool at scrape time."""
+    if not isinstance(pool, QueuePool):
+        return
+
+    db_pool_checked_out_connections.labels(engine=label).set_function(pool.checkedout)
+    db_pool_idle_connections.labels(engine=label).set_function(pool.checkedin)
+    db_pool_overflow_connections.labels(engine=label).set_function(pool.overflow)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+from datetime import datetime, timezone
+
+from prometheus_client import Gauge
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.db import get_session
+from app.models import OutboxEvent
+
+
+# --- Outbox health metrics ---
+outbox_unprocessed_total = Gauge(
+    "outbox_unprocessed_total",
+    "Number of unprocessed outbox events (PENDING+PROCESSING)",
+)
+
+outbox_oldest_unprocessed_age_seconds = Gauge(
+    "outbox_oldest_unprocessed_age_seconds",
+    "Age of oldest unprocessed outbox event in seconds",
+)
+
+
+UNPROCESSED_STATUSES = ("PENDING", "PROCESSING")
+
+logger = logging.getLogger("qhse.outbox.health")
+
+
+def _as_utc_aware(dt: datetime) -> datetime:
+    # Se dal DB arriva naive, assumiamo sia UTC (coerente con la demo)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _estimate_unprocessed(session: Session) -> int | None:
+    """Planner row estimate for the unprocessed filter (no table scan). Postgres only."""
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+
+    plan = session.execute(
+        text(
+            "EXPLAIN (FORMAT JSON) SELECT 1 FROM outbox_events "
+            "WHERE status IN ('PENDING', 'PROCESSING')"
+        )
+    ).scalar_one()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def sample_outbox_health(session: Session, *, estimate_above: int = 0) -> tuple[int, float]:
+    """
+    Set outbox_unprocessed_total / outbox_oldest_unprocessed_age_seconds; returns (count, age).
+
+    Exact mode: one aggregate query, count(*) + min(created_at), served by the partial index
+    ix_outbox_unprocessed_created_at. With estimate_above > 0 and a planner estimate above it,
+    the count is the estimate and only min(created_at) is queried (an index endpoint lookup).
+    """
+    unprocessed = OutboxEvent.status.in_(UNPROCESSED_STATUSES)
+
+    estimate = _estimate_unprocessed(session) if estimate_above > 0 else None
+
+    if estimate is not None and estimate > estimate_above:
+        count = estimate
+        oldest = session.execute(select(func.min(OutboxEvent.created_at)).where(unprocessed)).scalar_one()
+    else:
+        count, oldest = session.execute(
+            select(func.count(), func.min(OutboxEvent.created_at)).where(unprocessed)
+        ).one()
+
+    age = 0.0
+    if oldest is not None:
+        age = (datetime.now(timezone.utc) - _as_utc_aware(oldest)).total_seconds()
+
+    outbox_unprocessed_total.set(count)
+    outbox_oldest_unprocessed_age_seconds.set(age)
+    return int(count), age
+
+
+def run_health_sampler(stop: threading.Event, settings) -> None:
+    """Sample outbox health every OUTBOX_HEALTH_INTERVAL_SEC until `stop` is set."""
+    while True:
+        try:
+            with get_session() as session:
+                sample_outbox_health(session, estimate_above=settings.OUTBOX_HEALTH_ESTIMATE_ABOVE)
+        except Exception:
+            logger.warning("outbox health sampling failed", exc_info=True)
+
+        if stop.wait(settings.OUTBOX_HEALTH_INTERVAL_SEC):
+            return
+
+
+def start_health_sampler(stop: threading.Event, settings) -> threading.Thread:
+    t = threading.Thread(
+        target=run_health_sampler,
+        args=(stop, settings),
+        name="outbox-health-sampler",
+        daemon=True,
+    )
+    t.start()
+    return t
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional, Literal
 from pydantic import BaseModel, Field, ConfigDict
-from datetime import datetime
+from datetime import date, datetime
 
 
 Severity = Literal["low", "medium", "high"]
@@ -10,7 +10,7 @@ Severity = Literal["low", "medium", "high"]
 
 class SupplierCreate(BaseModel):
     name: str = Field(min_length=1, max_length=200)
-    certification_expiry: Optional[str] = Field(default=None, description="YYYY-MM-DD (demo)")
+    certification_expiry: Optional[date] = Field(default=None, description="YYYY-MM-DD")
 
 
 class SupplierOut(BaseModel):
@@ -18,7 +18,7 @@ class SupplierOut(BaseModel):
 
     id: int
     name: str
-    certification_expiry: Optional[str]
+    certification_expiry: Optional[date]
 
 
 class NCCreate(BaseModel):
@@ -42,7 +42,7 @@ class SupplierDetailOut(BaseModel):
 
     id: int
     name: str
-    certification_expiry: Optional[str]
+    certification_expiry: Optional[date]
 
     nc_total: int
     nc_open: int
@@ -51,7 +51,7 @@ class SupplierDetailOut(BaseModel):
 
 
 class SupplierCertUpdate(BaseModel):
-    certification_expiry: Optional[str] = Field(default=None, description="YYYY-MM-DD (demo)")
+    certification_expiry: Optional[date] = Field(default=None, description="YYYY-MM-DD")
 
 
 class AuditLogOut(BaseModel):
@@ -64,3 +64,35 @@ class AuditLogOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class DeadLetterOut(BaseModel):
+    id: int
+    outbox_id: int
+    event_id: str
+    event_type: str
+    payload_json: str
+    attempts: int
+    last_error: str
+    traceback_digest: Optional[str]
+    attempt_history_json: str
+    created_at: datetime
+    failed_at: datetime
+    replayed_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
+
+
+class DeadLetterPage(BaseModel):
+    items: list[DeadLetterOut]
+    next_after_id: Optional[int] = Field(default=None, description="Pass as after_id for the next page")
+
+
+class DeadLetterReplayIn(BaseModel):
+    ids: Optional[list[int]] = Field(default=None, max_length=10000)
+    event_type: Optional[str] = None
+    all: bool = Field(default=False, description="Replay every not-yet-replayed dead letter (combinable with event_type)")
+
+
+class DeadLetterReplayOut(BaseModel):
+    replayed: int
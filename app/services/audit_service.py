@@ -1,15 +1,34 @@
 from __future__ import annotations
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import AuditLog
 
 
-def list_audit_logs(session, offset: int = 0, limit: int = 20) -> list[AuditLog]:
+def list_audit_logs(session, offset: int = 0, limit: int = 20, after_id: int | None = None) -> list[AuditLog]:
+    """
+    Latest first. after_id = last id of the previous page (keyset: a PK range scan whatever
+    the depth); offset is the legacy way and degrades linearly on deep pages.
+    """
+    q = select(AuditLog)
+
+    if after_id is not None:
+        q = q.where(AuditLog.id < after_id)
+
     q = (
-        select(AuditLog)
-        .order_by(AuditLog.id.desc())  # latest first
+        q.order_by(AuditLog.id.desc())  # latest first
         .offset(offset)
         .limit(limit)
     )
     return list(session.execute(q).scalars().all())
+
+
+async def list_audit_logs_async(
+    session: AsyncSession,
+    offset: int = 0,
+    limit: int = 20,
+    after_id: int | None = None,
+) -> list[AuditLog]:
+    """Async read path (API): list_audit_logs run through run_sync on the AsyncSession."""
+    return await session.run_sync(list_audit_logs, offset=offset, limit=limit, after_id=after_id)
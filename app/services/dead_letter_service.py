@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.events.notify import notify_outbox
+from app.models import DeadLetterEvent, OutboxEvent
+from app.settings import get_settings
+
+
+def list_dead_letters(
+    session: Session,
+    *,
+    after_id: int | None = None,
+    limit: int = 50,
+    event_type: str | None = None,
+    include_replayed: bool = False,
+) -> list[DeadLetterEvent]:
+    """Keyset page (id ASC): pass the last id of the previous page as after_id."""
+    q = select(DeadLetterEvent)
+
+    if not include_replayed:
+        q = q.where(DeadLetterEvent.replayed_at.is_(None))
+
+    if event_type:
+        q = q.where(DeadLetterEvent.event_type == event_type)
+
+    if after_id is not None:
+        q = q.where(DeadLetterEvent.id > after_id)
+
+    q = q.order_by(DeadLetterEvent.id.asc()).limit(limit)
+    return list(session.execute(q).scalars().all())
+
+
+def replay_dead_letters(
+    session: Session,
+    *,
+    ids: list[int] | None = None,
+    event_type: str | None = None,
+    replay_all: bool = False,
+) -> int:
+    """
+    Re-enqueue not-yet-replayed dead letters as fresh PENDING outbox events (same event_id,
+    attempts reset) and stamp them replayed_at, in one statement:
+    UPDATE ... RETURNING (CTE) feeding INSERT INTO outbox_events.
+
+    Selection: explicit ids, and/or an event_type, or replay_all=True.
+    Returns the number of re-enqueued events.
+    """
+    if not ids and not event_type and not replay_all:
+        raise ValueError("Nothing selected for replay")
+
+    now = datetime.now(timezone.utc)
+
+    picked = update(DeadLetterEvent).where(DeadLetterEvent.replayed_at.is_(None))
+    if ids:
+        picked = picked.where(DeadLetterEvent.id.in_(ids))
+    if event_type:
+        picked = picked.where(DeadLetterEvent.event_type == event_type)
+
+    picked_cte = (
+        picked.values(replayed_at=now)
+        .returning(
+            DeadLetterEvent.event_id,
+            DeadLetterEvent.event_type,
+            DeadLetterEvent.payload_json,
+            DeadLetterEvent.meta_json,
+            DeadLetterEvent.partition_key,
+            DeadLetterEvent.created_at,
+        )
+        .cte("picked")
+    )
+
+    stmt = (
+        pg_insert(OutboxEvent)
+        .from_select(
+            ["event_id", "event_type", "payload_json", "meta_json", "partition_key", "created_at", "status", "attempts"],
+            select(
+                picked_cte.c.event_id,
+                picked_cte.c.event_type,
+                picked_cte.c.payload_json,
+                picked_cte.c.meta_json,
+                picked_cte.c.partition_key,
+                picked_cte.c.created_at,
+                literal("PENDING"),
+                literal(0),
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=[OutboxEvent.event_id])
+        .returning(OutboxEvent.id)
+    )
+
+    replayed = len(session.execute(stmt).all())
+    if replayed and get_settings().OUTBOX_NOTIFY_ENABLED:
+        notify_outbox(session)
+    return replayed
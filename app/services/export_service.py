@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+from datetime import datetime, timezone
+from typing import Iterator, Literal
+
+from sqlalchemy import Select, select
+
+from app.db import get_session
+from app.models import AuditLog, NonConformity
+from app.settings import get_settings
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+AUDIT_EXPORT_COLUMNS = ("id", "actor", "action", "entity_type", "entity_id", "meta_json", "created_at")
+NC_EXPORT_COLUMNS = ("id", "supplier_id", "severity", "status", "description", "created_at")
+
+
+def _naive_utc(dt: datetime | None) -> datetime | None:
+    # created_at columns are naive UTC
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _created_between(q: Select, column, created_from: datetime | None, created_to: datetime | None) -> Select:
+    """created_from inclusive, created_to exclusive."""
+    if created_from is not None:
+        q = q.where(column >= _naive_utc(created_from))
+    if created_to is not None:
+        q = q.where(column < _naive_utc(created_to))
+    return q
+
+
+def audit_export_query(
+    *,
+    entity_type: str | None = None,
+    action: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> Select:
+    q = select(*(getattr(AuditLog, c) for c in AUDIT_EXPORT_COLUMNS))
+
+    if entity_type:
+        q = q.where(AuditLog.entity_type == entity_type)
+    if action:
+        q = q.where(AuditLog.action == action)
+
+    q = _created_between(q, AuditLog.created_at, created_from, created_to)
+    return q.order_by(AuditLog.id.asc())
+
+
+def nc_export_query(
+    *,
+    status: str | None = None,
+    severity: str | None = None,
+    supplier_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> Select:
+    q = select(*(getattr(NonConformity, c) for c in NC_EXPORT_COLUMNS))
+
+    if status:
+        q = q.where(NonConformity.status == status)
+    if severity:
+        q = q.where(NonConformity.severity == severity)
+    if supplier_id is not None:
+        q = q.where(NonConformity.supplier_id == supplier_id)
+
+    q = _created_between(q, NonConformity.created_at, created_from, created_to)
+    return q.order_by(NonConformity.id.asc())
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def _format_chunk(rows, columns: tuple[str, ...], fmt: ExportFormat) -> str:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default) + "\n" for row in rows
+        )
+
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerows(
+        [v.isoformat() if isinstance(v, datetime) else v for v in row] for row in rows
+    )
+    return buf.getvalue()
+
+
+def iter_export(
+    q: Select,
+    columns: tuple[str, ...],
+    fmt: ExportFormat,
+    *,
+    batch_size: int | None = None,
+) -> Iterator[str]:
+    """
+    Stream the rows of `q` as NDJSON lines or CSV (header first), one text chunk per fetch.
+
+    Memory stays flat whatever the size: plain column rows (no ORM identity map) read through a
+    server-side cursor (yield_per -> stream_results), batch_size rows at a time. The generator
+    owns its session, so it outlives the request handler and is closed with the response.
+    """
+    batch_size = batch_size or get_settings().EXPORT_BATCH_SIZE
+
+    if fmt == "csv":
+        yield _format_chunk([columns], columns, fmt)
+
+    with get_session() as session:
+        result = session.execute(q.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            yield _format_chunk(rows, columns, fmt)
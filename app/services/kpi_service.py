@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.events.kpi_snapshot import SNAPSHOT_ID, refresh_kpi_snapshot
+from app.models import DeadLetterEvent, KpiSnapshot, OutboxEvent
+
+
+def _kpi_query():
+    """
+    The snapshot row + the two outbox counters, in one statement.
+
+    Outbox counters stay live: both are counts over partial indexes bounded by the backlog
+    (PENDING rows, unreplayed dead letters), not by history.
+    """
+    outbox_pending = (
+        select(func.count()).select_from(OutboxEvent).where(OutboxEvent.status == "PENDING").scalar_subquery()
+    )
+    # FAILED events live in the dead-letter store (partial index on not-yet-replayed rows)
+    outbox_failed = (
+        select(func.count())
+        .select_from(DeadLetterEvent)
+        .where(DeadLetterEvent.replayed_at.is_(None))
+        .scalar_subquery()
+    )
+
+    return select(
+        KpiSnapshot.nc_open,
+        KpiSnapshot.nc_open_high,
+        KpiSnapshot.nc_closed,
+        outbox_pending.label("outbox_pending"),
+        outbox_failed.label("outbox_failed"),
+        KpiSnapshot.suppliers_at_risk,
+        KpiSnapshot.audit_events_total,
+        KpiSnapshot.as_of_date,
+    ).where(KpiSnapshot.id == SNAPSHOT_ID)
+
+
+def compute_kpi(session: Session) -> dict:
+    """
+    KPI from the kpi_snapshot row (kept current by the outbox handlers).
+
+    The row is (re)built on the first read of the day: suppliers_at_risk depends on today's
+    date (certification expiry), which no event announces.
+    """
+    today = date.today()
+
+    row = session.execute(_kpi_query()).one_or_none()
+    if row is None or row.as_of_date != today:
+        refresh_kpi_snapshot(session, today=today, only_if_stale=True)
+        row = session.execute(_kpi_query()).one()
+
+    return {
+        "nc_open": row.nc_open,
+        "nc_open_high": row.nc_open_high,
+        "nc_closed": row.nc_closed,
+        "outbox_pending": row.outbox_pending,
+        "outbox_failed": row.outbox_failed,
+        "suppliers_at_risk": row.suppliers_at_risk,
+        "audit_events_total": row.audit_events_total,
+    }
+
+
+async def compute_kpi_async(session: AsyncSession) -> dict:
+    """Async entrypoint: same queries, run through run_sync on the async connection."""
+    return await session.run_sync(compute_kpi)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models import NonConformity, Supplier
@@ -40,10 +41,12 @@ def close_nc(session: Session, nc_id: int) -> NonConformity:
     nc = session.get(NonConformity, nc_id)
     if nc is None:
         raise ValueError("NC not found")
+    previous_status = nc.status
     nc.status = "CLOSED"
     session.flush()
 
-    payload: dict[str, object] = {"nc_id": nc.id}
+    # previous_status: lets the supplier_stats projection ignore a re-close
+    payload: dict[str, object] = {"nc_id": nc.id, "previous_status": previous_status}
 
     enqueue_event(
         session,
@@ -59,9 +62,13 @@ def list_ncs(
     limit: int = 20,
     status: str | None = None,
     severity: str | None = None,
+    after_id: int | None = None,
 ) -> list[NonConformity]:
     q = select(NonConformity)
 
+    if after_id is not None:
+        q = q.where(NonConformity.id > after_id)  # keyset: last id of the previous page
+
     if status:
         q = q.where(NonConformity.status == status)
 
@@ -74,3 +81,22 @@ def list_ncs(
         .limit(limit)
     )
     return list(session.execute(q).scalars().all())
+
+
+async def list_ncs_async(
+    session: AsyncSession,
+    offset: int = 0,
+    limit: int = 20,
+    status: str | None = None,
+    severity: str | None = None,
+    after_id: int | None = None,
+) -> list[NonConformity]:
+    """Async read path (API): list_ncs run through run_sync on the AsyncSession."""
+    return await session.run_sync(
+        list_ncs,
+        offset=offset,
+        limit=limit,
+        status=status,
+        severity=severity,
+        after_id=after_id,
+    )
@@ -3,19 +3,21 @@ from __future__ import annotations
 from datetime import date
 import json
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select, func
 
-from app.models import Supplier
-from app.models import NonConformity
+from app.models import Supplier, SupplierStats
 from app.models import AuditLog
 
 from app.events.outbox import enqueue_event
+from app.events.projections import projection_buffer
+from app.events.supplier_stats import supplier_at_risk_clause
 from app.logging_utils import get_request_id
 
 
-def create_supplier(session: Session, name: str, certification_expiry: str | None) -> Supplier:
+def create_supplier(session: Session, name: str, certification_expiry: date | None) -> Supplier:
     s = Supplier(name=name, certification_expiry=certification_expiry)
     session.add(s)
     try:
@@ -23,58 +25,83 @@ def create_supplier(session: Session, name: str, certification_expiry: str | Non
     except IntegrityError:
         # unique constraint on name
         raise ValueError("Supplier name already exists")
+
+    # supplier_stats row + suppliers_at_risk (created already expired), applied at commit
+    # like the event handlers' changes (app.events.projections)
+    projection_buffer(session).certifications[s.id] = s.certification_expiry
     return s
 
 
+def _supplier_detail_query(today: date):
+    """
+    Supplier columns + NC counters in one statement, O(1) per supplier: counters come from
+    supplier_stats (maintained by the NC event handlers); no stats row yet = no NCs.
+    is_at_risk uses the same predicate as the suppliers_at_risk KPI, on the certification_expiry
+    returned in the same row (not the copy in supplier_stats, which lags until the worker runs).
+    """
+    return select(
+        Supplier.id,
+        Supplier.name,
+        Supplier.certification_expiry,
+        func.coalesce(SupplierStats.nc_total, 0).label("nc_total"),
+        func.coalesce(SupplierStats.nc_open, 0).label("nc_open"),
+        func.coalesce(SupplierStats.nc_open_high, 0).label("nc_open_high"),
+        supplier_at_risk_clause(today, live_certification=True).label("is_at_risk"),
+    ).outerjoin(SupplierStats, SupplierStats.supplier_id == Supplier.id)
+
+
+def _supplier_detail_from_row(row) -> dict:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "certification_expiry": row.certification_expiry,
+        "nc_total": int(row.nc_total),
+        "nc_open": int(row.nc_open),
+        "nc_open_high": int(row.nc_open_high),
+        "is_at_risk": bool(row.is_at_risk),
+    }
+
+
 def get_supplier_detail(session: Session, supplier_id: int) -> dict:
-    s = session.get(Supplier, supplier_id)
-    if s is None:
+    row = session.execute(_supplier_detail_query(date.today()).where(Supplier.id == supplier_id)).one_or_none()
+    if row is None:
         raise ValueError("Supplier not found")
 
-    nc_total = session.execute(
-        select(func.count()).select_from(NonConformity).where(NonConformity.supplier_id == supplier_id)
-    ).scalar_one()
+    return _supplier_detail_from_row(row)
 
-    nc_open = session.execute(
-        select(func.count()).select_from(NonConformity).where(
-            NonConformity.supplier_id == supplier_id,
-            NonConformity.status == "OPEN",
-        )
-    ).scalar_one()
 
-    nc_open_high = session.execute(
-        select(func.count()).select_from(NonConformity).where(
-            NonConformity.supplier_id == supplier_id,
-            NonConformity.status == "OPEN",
-            NonConformity.severity == "high",
-        )
-    ).scalar_one()
+def get_supplier_details(session: Session, supplier_ids: list[int]) -> list[dict]:
+    """Batch variant of get_supplier_detail (list screens): one query, ordered by id; unknown ids are skipped."""
+    ids = list(dict.fromkeys(supplier_ids))
+    if not ids:
+        return []
 
-    today = date.today().isoformat()
-    cert_expired = (s.certification_expiry is not None) and (s.certification_expiry < today)
+    rows = session.execute(
+        _supplier_detail_query(date.today()).where(Supplier.id.in_(ids)).order_by(Supplier.id.asc())
+    ).all()
 
-    is_at_risk = cert_expired or (nc_open_high > 0)
+    return [_supplier_detail_from_row(row) for row in rows]
 
-    return {
-        "id": s.id,
-        "name": s.name,
-        "certification_expiry": s.certification_expiry,
-        "nc_total": int(nc_total),
-        "nc_open": int(nc_open),
-        "nc_open_high": int(nc_open_high),
-        "is_at_risk": bool(is_at_risk),
-    }
 
+def _iso(d: date | None) -> str | None:
+    # event payloads are JSON
+    return d.isoformat() if d is not None else None
 
-def update_supplier_certification(session: Session, supplier_id: int, certification_expiry: str | None) -> Supplier:
+
+def update_supplier_certification(session: Session, supplier_id: int, certification_expiry: date | None) -> Supplier:
     s = session.get(Supplier, supplier_id)
     if s is None:
         raise ValueError("Supplier not found")
 
+    previous = s.certification_expiry
     s.certification_expiry = certification_expiry
     session.flush()
 
-    payload = {"supplier_id": s.id, "certification_expiry": s.certification_expiry}
+    payload = {
+        "supplier_id": s.id,
+        "certification_expiry": _iso(s.certification_expiry),
+        "previous_certification_expiry": _iso(previous),
+    }
     rid = get_request_id()
     if rid:
         payload["request_id"] = rid
@@ -87,11 +114,54 @@ def update_supplier_certification(session: Session, supplier_id: int, certificat
     return s
 
 
-def list_suppliers(session, offset: int = 0, limit: int = 20) -> list[Supplier]:
+def list_suppliers(
+    session,
+    offset: int = 0,
+    limit: int = 20,
+    expiring_before: date | None = None,
+    after_id: int | None = None,
+) -> list[Supplier]:
+    q = select(Supplier)
+
+    if after_id is not None:
+        q = q.where(Supplier.id > after_id)  # keyset: last id of the previous page
+
+    if expiring_before:
+        # certification_expiry < expiring_before (already expired included, no certification excluded)
+        q = q.where(Supplier.certification_expiry < expiring_before)
+
     q = (
-        select(Supplier)
-        .order_by(Supplier.id.asc())
+        q.order_by(Supplier.id.asc())
         .offset(offset)
         .limit(limit)
     )
     return list(session.execute(q).scalars().all())
+
+
+# --- Async read path (API) ---
+# Same query code as the sync functions, run through run_sync on the AsyncSession:
+# the DB round trips are awaited on the event loop instead of holding a threadpool slot.
+
+
+async def get_supplier_detail_async(session: AsyncSession, supplier_id: int) -> dict:
+    return await session.run_sync(get_supplier_detail, supplier_id)
+
+
+async def get_supplier_details_async(session: AsyncSession, supplier_ids: list[int]) -> list[dict]:
+    return await session.run_sync(get_supplier_details, supplier_ids)
+
+
+async def list_suppliers_async(
+    session: AsyncSession,
+    offset: int = 0,
+    limit: int = 20,
+    expiring_before: date | None = None,
+    after_id: int | None = None,
+) -> list[Supplier]:
+    return await session.run_sync(
+        list_suppliers,
+        offset=offset,
+        limit=limit,
+        expiring_before=expiring_before,
+        after_id=after_id,
+    )
@@ -17,9 +17,55 @@ class Settings(BaseSettings):
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MIN: int = 60
 
-    OUTBOX_BATCH_SIZE: int = 10
+    # SQLAlchemy connection pool (sync and async engines, each per process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SEC: float = 30.0  # max wait for a free connection before TimeoutError
+    DB_POOL_RECYCLE_SEC: int = 1800  # reopen connections older than this; -1 = never
+    DB_POOL_PRE_PING: bool = True  # test connections on checkout (drops ones killed by the server/LB)
+
+    OUTBOX_BATCH_SIZE: int = 10  # initial claim size; the worker loop adapts it within MIN..MAX
+    OUTBOX_BATCH_SIZE_MIN: int = 1
+    OUTBOX_BATCH_SIZE_MAX: int = 500
+    OUTBOX_TARGET_JOB_SEC: float = 0.5  # shrink the batch when avg job latency exceeds this
     OUTBOX_LOCK_TIMEOUT_SEC: int = 30
     OUTBOX_MAX_ATTEMPTS: int = 5
+    # Failed attempts are retried after base * 2^(attempts-1) seconds (jittered, capped); 0 = immediately
+    OUTBOX_RETRY_BASE_SEC: float = 2.0
+    OUTBOX_RETRY_MAX_SEC: float = 300.0
+    # Per-aggregate ordering: an event with a partition_key is claimable only once every older
+    # event of the same partition is DONE or dead-lettered (different partitions run in parallel)
+    OUTBOX_ORDERED_PARTITIONS: bool = True
+    # Process a claimed batch in one transaction (per-event SAVEPOINTs) instead of one tx per event
+    OUTBOX_BATCH_SINGLE_TX: bool = False
+    # enqueue_event emits NOTIFY on commit; the worker LISTENs and polls only as a fallback
+    OUTBOX_NOTIFY_ENABLED: bool = True
+    # Idle wait: starts at POLL_INTERVAL, doubles on each empty poll up to IDLE_MAX
+    # (with LISTEN enabled this is only the fallback; a NOTIFY wakes the worker earlier)
+    OUTBOX_POLL_INTERVAL_SEC: float = 1.0
+    OUTBOX_IDLE_MAX_SEC: float = 10.0
+
+    # Outbox health gauges are sampled on their own interval (not per batch).
+    # ESTIMATE_ABOVE > 0: above that many rows report the planner estimate instead of count(*)
+    OUTBOX_HEALTH_INTERVAL_SEC: float = 15.0
+    OUTBOX_HEALTH_ESTIMATE_ABOVE: int = 0
+
+    # Retention (python -m app.events.retention): DONE outbox rows move to outbox_events_archive,
+    # processed_events dedup rows are pruned (never before their outbox row has left the hot table)
+    OUTBOX_RETENTION_DAYS: int = 7
+    PROCESSED_EVENTS_RETENTION_DAYS: int = 30
+    RETENTION_BATCH_SIZE: int = 1000
+
+    # Bulk audit writes (app.audit_utils.write_audit_rows): COPY from this many rows, executemany below; 0 = never COPY
+    AUDIT_COPY_THRESHOLD: int = 500
+
+    # Streaming exports (GET /audit-log/export, /ncs/export): rows per server-side cursor fetch
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Claim/process loops per worker process (python -m app.worker --concurrency N)
+    WORKER_CONCURRENCY: int = 1
+    # Max events handled concurrently by the asyncio worker (python -m app.async_worker)
+    ASYNC_WORKER_MAX_IN_FLIGHT: int = 10
 
     LOG_LEVEL: str = "INFO"
     LOG_JSON: bool = True
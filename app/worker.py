@@ -1,25 +1,35 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
 import logging
+import os
+import random
+import signal
+import socket
+import sys
+import threading
 import time
+import traceback
 import uuid
 import json
 
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Iterable, List, NamedTuple
 
-from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, exists, insert, or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
 
 from app.db import get_session
-from app.events.handlers import (
-    handle_nc_closed,
-    handle_nc_created,
-    handle_supplier_cert_updated,
-)
+from app.events.notify import OutboxListener
+from app.events.projections import projection_scope
+import app.events.handlers  # noqa: F401  (registers the built-in event handlers)
+from app.events.registry import get_handler
 from app.logging_utils import configure_logging, set_request_id, get_request_id
-from app.models import OutboxEvent, ProcessedEvent
+from app.models import DeadLetterEvent, OutboxEvent, ProcessedEvent
 from app.settings import get_settings
+from app.observability.outbox_health import start_health_sampler
 from app.observability.worker_tracing import setup_worker_tracing
 
 from opentelemetry.propagate import extract
@@ -52,27 +62,23 @@ worker_job_duration_seconds = Histogram(
     ["event_type"],
 )
 
-# --- Outbox health metrics ---
-outbox_unprocessed_total = Gauge(
-    "outbox_unprocessed_total",
-    "Number of unprocessed outbox events (PENDING+PROCESSING)",
+# --- Adaptive loop metrics ---
+worker_batch_size = Gauge(
+    "worker_batch_size",
+    "Claim size chosen by the adaptive controller for the next batch",
+    ["slot"],  # worker loop slot inside the process (--concurrency)
 )
 
-outbox_oldest_unprocessed_age_seconds = Gauge(
-    "outbox_oldest_unprocessed_age_seconds",
-    "Age of oldest unprocessed outbox event in seconds",
+worker_idle_interval_seconds = Gauge(
+    "worker_idle_interval_seconds",
+    "Wait before the next poll chosen by the adaptive controller (0 = backlog, no wait)",
+    ["slot"],
 )
 
 
 logger = logging.getLogger("qhse.worker")
 
 
-def _as_utc_aware(dt: datetime) -> datetime:
-    # Se dal DB arriva naive, assumiamo sia UTC (coerente con la demo)
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    # Se è già aware, la portiamo comunque in UTC
-    return dt.astimezone(timezone.utc)
 def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -86,62 +92,169 @@ def mark_processed(session: Session, event_id: str) -> None:
     session.add(ProcessedEvent(event_id=event_id))
 
 
-def process_one_event(session: Session, ev: OutboxEvent) -> None:
-    # Idempotenza: se già processato, non rifare effetti
-    if is_already_processed(session, ev.event_id):
-        ev.status = "DONE"
-        ev.processed_at = utcnow()
-        ev.locked_by = None
-        ev.locked_at = None
+def fetch_processed_event_ids(session: Session, event_ids: Iterable[str]) -> set[str]:
+    """Resolve which of event_ids are already processed, with one IN (...) query."""
+    ids = list(event_ids)
+    if not ids:
+        return set()
+
+    q = select(ProcessedEvent.event_id).where(ProcessedEvent.event_id.in_(ids))
+    return set(session.execute(q).scalars())
+
+
+def mark_processed_bulk(session: Session, event_ids: Iterable[str]) -> None:
+    """
+    Insert all ProcessedEvent rows with one multi-row INSERT.
+
+    Postgres: ON CONFLICT DO NOTHING, so a reclaimed event that was already marked
+    does not abort the batch transaction.
+    """
+    ids = list(dict.fromkeys(event_ids))
+    if not ids:
         return
 
-    if ev.event_type == "NC_CREATED":
-        handle_nc_created(session, ev.payload_json)
-    elif ev.event_type == "NC_CLOSED":
-        handle_nc_closed(session, ev.payload_json)
-    elif ev.event_type == "SUPPLIER_CERT_UPDATED":
-        handle_supplier_cert_updated(session, ev.payload_json)
+    now = utcnow()
+    rows = [{"event_id": eid, "processed_at": now} for eid in ids]
+
+    if session.get_bind().dialect.name == "postgresql":
+        stmt = pg_insert(ProcessedEvent).values(rows).on_conflict_do_nothing(
+            index_elements=[ProcessedEvent.event_id]
+        )
     else:
-        raise ValueError(f"Unknown event_type: {ev.event_type}")
+        stmt = insert(ProcessedEvent).values(rows)
+
+    session.execute(stmt)
 
-    mark_processed(session, ev.event_id)
+
+def _mark_done(ev: OutboxEvent) -> None:
     ev.status = "DONE"
     ev.processed_at = utcnow()
     ev.locked_by = None
     ev.locked_at = None
 
 
-def claim_outbox_ids(
+def decode_payload(ev: OutboxEvent) -> dict:
+    """
+    Payload passed to handlers. The event's request_id (meta_json) is filled in when missing,
+    so audit rows keep the originating request even when a whole batch is handled at once.
+    """
+    payload = json.loads(ev.payload_json)
+    rid, _tp = _parse_meta(ev.meta_json)
+    if rid and isinstance(payload, dict):
+        payload.setdefault("request_id", rid)
+    return payload
+
+
+def process_one_event(
     session: Session,
+    ev: OutboxEvent,
     *,
-    limit: int,
-    worker_id: str,
-    lock_timeout_sec: int,
-) -> List[int]:
+    already_processed: set[str] | None = None,
+) -> None:
     """
-    Atomically claim a batch of outbox events.
+    Apply the registered handler for ev (as a batch of one) and mark it DONE.
 
-    Postgres: uses SELECT ... FOR UPDATE SKIP LOCKED (true multi-worker safety).
-    Reclaim rule: PROCESSING events with locked_at older than now - lock_timeout_sec are reclaimable.
+    already_processed=None: per-event idempotency (SELECT + INSERT on processed_events).
+    already_processed=set: batch mode; the set was resolved upfront by fetch_processed_event_ids
+    and the caller writes ProcessedEvent rows afterwards via mark_processed_bulk.
     """
-    now = utcnow()
-    stale_cutoff = now - timedelta(seconds=lock_timeout_sec)
+    if already_processed is None:
+        is_dup = is_already_processed(session, ev.event_id)
+    else:
+        is_dup = ev.event_id in already_processed
+
+    # Idempotenza: se già processato, non rifare effetti
+    if is_dup:
+        _mark_done(ev)
+        return
 
+    # read-model deltas count only if the handler succeeds (see app.events.projections)
+    with projection_scope(session):
+        get_handler(ev.event_type)(session, [decode_payload(ev)])
+
+    if already_processed is None:
+        mark_processed(session, ev.event_id)
+    _mark_done(ev)
+
+
+def build_claim_query(
+    *,
+    limit: int,
+    stale_cutoff: datetime,
+    dialect: str,
+    split_branches: bool = True,
+    now: datetime | None = None,
+    ordered_partitions: bool = True,
+):
+    """
+    SELECT for the claimable outbox rows, lowest id first.
+
+    Claimable = PENDING whose retry time has come (next_attempt_at NULL or <= now),
+    or PROCESSING with a stale lock (locked_at NULL or older than stale_cutoff).
+
+    ordered_partitions=True: a row with a partition_key is claimable only if it is the head of
+    its partition (no older PENDING/PROCESSING row with the same key). The state lives in the
+    rows themselves, so it holds across claim and processing transactions and across workers:
+    at most one event per aggregate is in flight, different aggregates are claimed in parallel.
+    A head waiting for its retry blocks its partition; once dead-lettered it leaves the table
+    and the next event goes ahead.
+
+    Postgres (split_branches=True): the OR is split into three CTE branches, each matching one
+    partial index and each locking with FOR UPDATE SKIP LOCKED (not allowed directly on a
+    UNION): never attempted PENDING rows in id order (ix_outbox_claim_pending), PENDING rows
+    whose retry time has come by next_attempt_at range (ix_outbox_claim_retry, so rows still
+    backing off are never visited), stale PROCESSING rows (ix_outbox_claim_processing).
+    The outer query keeps the lowest `limit` ids. A branch can lock up to `limit` rows that end
+    up unclaimed: they are released when the claiming transaction ends.
+
+    Otherwise: single OR filter (plus FOR UPDATE SKIP LOCKED on Postgres).
+    """
+    now = now or utcnow()
+    # never attempted / retry time has come: one branch each on Postgres (see below)
+    fresh_pending = and_(OutboxEvent.status == "PENDING", OutboxEvent.next_attempt_at.is_(None))
+    due_retry = and_(OutboxEvent.status == "PENDING", OutboxEvent.next_attempt_at <= now)
     reclaimable_processing = and_(
         OutboxEvent.status == "PROCESSING",
         or_(OutboxEvent.locked_at.is_(None), OutboxEvent.locked_at < stale_cutoff),
     )
 
-    claim_filter = or_(
-        OutboxEvent.status == "PENDING",
-        reclaimable_processing,
-    )
-
-    dialect = session.get_bind().dialect.name
+    if ordered_partitions:
+        older = aliased(OutboxEvent)
+        blocked = exists().where(
+            older.partition_key == OutboxEvent.partition_key,
+            older.id < OutboxEvent.id,
+            older.status.in_(("PENDING", "PROCESSING")),
+        )
+        fresh_pending = and_(fresh_pending, ~blocked)
+        due_retry = and_(due_retry, ~blocked)
+        reclaimable_processing = and_(reclaimable_processing, ~blocked)
+
+    if dialect == "postgresql" and split_branches:
+        branches = [
+            select(OutboxEvent.id)
+            .where(branch_filter)
+            .order_by(OutboxEvent.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte(name)
+            for name, branch_filter in (
+                ("claim_pending", fresh_pending),
+                ("claim_retry", due_retry),
+                ("claim_stale", reclaimable_processing),
+            )
+        ]
+        candidate_ids = union_all(*(select(b.c.id) for b in branches))
+
+        return (
+            select(OutboxEvent)
+            .where(OutboxEvent.id.in_(candidate_ids))
+            .order_by(OutboxEvent.id.asc())
+            .limit(limit)
+        )
 
     q = (
         select(OutboxEvent)
-        .where(claim_filter)
+        .where(or_(fresh_pending, due_retry, reclaimable_processing))
         .order_by(OutboxEvent.id.asc())
         .limit(limit)
     )
@@ -149,19 +262,61 @@ def claim_outbox_ids(
     if dialect == "postgresql":
         q = q.with_for_update(skip_locked=True)
 
+    return q
+
+
+def claim_outbox_events(
+    session: Session,
+    *,
+    limit: int,
+    worker_id: str,
+    lock_timeout_sec: int,
+) -> List[OutboxEvent]:
+    """
+    Atomically claim a batch of outbox events and return the loaded rows.
+
+    Postgres: uses SELECT ... FOR UPDATE SKIP LOCKED (true multi-worker safety).
+    Reclaim rule: PROCESSING events with locked_at older than now - lock_timeout_sec are reclaimable.
+    """
+    now = utcnow()
+    stale_cutoff = now - timedelta(seconds=lock_timeout_sec)
+
+    q = build_claim_query(
+        limit=limit,
+        stale_cutoff=stale_cutoff,
+        dialect=session.get_bind().dialect.name,
+        now=now,
+        ordered_partitions=get_settings().OUTBOX_ORDERED_PARTITIONS,
+    )
+
     # IMPORTANT: keep this claim inside the current transaction.
     rows = list(session.execute(q).scalars())
 
-    claimed_ids: List[int] = []
     for ev in rows:
         ev.status = "PROCESSING"
         ev.locked_by = worker_id
         ev.locked_at = now
         ev.attempts += 1
-        claimed_ids.append(ev.id)
 
     session.flush()
-    return claimed_ids
+    return rows
+
+
+def claim_outbox_ids(
+    session: Session,
+    *,
+    limit: int,
+    worker_id: str,
+    lock_timeout_sec: int,
+) -> List[int]:
+    """Same as claim_outbox_events, but returns only the claimed ids."""
+    rows = claim_outbox_events(
+        session,
+        limit=limit,
+        worker_id=worker_id,
+        lock_timeout_sec=lock_timeout_sec,
+    )
+    return [ev.id for ev in rows]
 
 
 def _claim_batch(batch: int, worker_id: str, settings) -> list[int]:
@@ -184,7 +339,36 @@ def _start_worker_span(tp: str | None):
     return tracer.start_as_current_span("worker.process_event")
 
 
-def _process_single_event(session, ev: OutboxEvent, settings) -> int:
+def _trace_links(events: list[OutboxEvent]) -> list[trace.Link]:
+    """
+    One span link per event to the request that enqueued it (traceparent in meta_json):
+    a grouped batch span has many parents, so they are links instead of the span's context.
+    """
+    links = []
+    for ev in events:
+        _rid, tp = _parse_meta(ev.meta_json)
+        if not tp:
+            continue
+        span_context = trace.get_current_span(extract({"traceparent": tp})).get_span_context()
+        if span_context.is_valid:
+            links.append(trace.Link(span_context, {"event_id": ev.event_id}))
+    return links
+
+
+def _process_single_event(
+    session,
+    ev: OutboxEvent,
+    settings,
+    *,
+    already_processed: set[str] | None = None,
+) -> int:
+    """
+    Process one claimed event, isolating failures via _handle_processing_error.
+
+    The handler runs in a SAVEPOINT: a failing event rolls back its own effects (audit rows
+    included) before the failure policy records the attempt, and a surrounding batch
+    transaction stays usable.
+    """
     t1 = time.time()
     try:
         prev_rid = get_request_id()
@@ -194,7 +378,8 @@ def _process_single_event(session, ev: OutboxEvent, settings) -> int:
             set_request_id(rid)
 
         with _start_worker_span(tp):
-            process_one_event(session, ev)
+            with projection_scope(session), session.begin_nested():
+                process_one_event(session, ev, already_processed=already_processed)
 
         worker_jobs_processed_total.labels(status="success", event_type=ev.event_type).inc()
         return 1
@@ -224,14 +409,88 @@ def _parse_meta(meta_json: str | None) -> tuple[str | None, str | None]:
     return rid, tp
 
 
+def compute_retry_delay(attempts: int, *, base_sec: float, max_sec: float) -> float:
+    """
+    Exponential backoff with jitter: base * 2^(attempts-1), capped at max_sec,
+    then a random value in [delay/2, delay] so retries of a burst spread out.
+    """
+    if base_sec <= 0:
+        return 0.0
+
+    delay = min(max_sec, base_sec * (2 ** max(0, attempts - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+_MAX_ERROR_CHARS = 8000
+
+
+def _record_failed_attempt(ev: OutboxEvent, now: datetime) -> tuple[str, str]:
+    """
+    Append the current exception to ev.error_history_json.
+    Must be called from an except block; returns (traceback_text, traceback_digest).
+    """
+    exc_type, exc, _tb = sys.exc_info()
+    tb_text = traceback.format_exc()[-_MAX_ERROR_CHARS:]
+    error = "".join(traceback.format_exception_only(exc_type, exc)).strip() if exc_type else "unknown error"
+    digest = hashlib.sha256(tb_text.encode("utf-8")).hexdigest()
+
+    try:
+        history = json.loads(ev.error_history_json or "[]")
+    except ValueError:
+        history = []
+
+    history.append(
+        {
+            "attempt": ev.attempts,
+            "at": now.isoformat(),
+            "error": error[:500],
+            "traceback_digest": digest,
+        }
+    )
+    ev.error_history_json = json.dumps(history, ensure_ascii=False)
+    return tb_text, digest
+
+
+def _dead_letter(session, ev: OutboxEvent, *, last_error: str, traceback_digest: str) -> None:
+    """Move an exhausted event out of the hot outbox table into outbox_dead_letters."""
+    session.add(
+        DeadLetterEvent(
+            outbox_id=ev.id,
+            event_id=ev.event_id,
+            event_type=ev.event_type,
+            payload_json=ev.payload_json,
+            meta_json=ev.meta_json,
+            partition_key=ev.partition_key,
+            attempts=ev.attempts,
+            last_error=last_error,
+            traceback_digest=traceback_digest,
+            attempt_history_json=ev.error_history_json or "[]",
+            created_at=ev.created_at,
+        )
+    )
+    session.delete(ev)
+
+
 def _handle_processing_error(session, ev: OutboxEvent, settings) -> None:
+    now = utcnow()
+    tb_text, digest = _record_failed_attempt(ev, now)
+
+    ev.locked_by = None
+    ev.locked_at = None
+
     if ev.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
         ev.status = "FAILED"
+        ev.next_attempt_at = None
+        _dead_letter(session, ev, last_error=tb_text, traceback_digest=digest)
     else:
         ev.status = "PENDING"
+        delay = compute_retry_delay(
+            ev.attempts,
+            base_sec=settings.OUTBOX_RETRY_BASE_SEC,
+            max_sec=settings.OUTBOX_RETRY_MAX_SEC,
+        )
+        ev.next_attempt_at = now + timedelta(seconds=delay)
 
-    ev.locked_by = None
-    ev.locked_at = None
     session.flush()
 
     logger.exception(
@@ -245,57 +504,345 @@ def _handle_processing_error(session, ev: OutboxEvent, settings) -> None:
     )
 
 
-def run_once(limit: int | None = None) -> int:
+def _process_event_group(session, events: list[OutboxEvent], settings, *, already_processed: set[str]) -> int:
+    """
+    Hand all events of one type to their batch handler in one call, inside one SAVEPOINT.
+
+    If the group fails, it is rolled back and replayed event by event (own SAVEPOINT each),
+    so only the offending events go through the failure policy.
+    """
+    if len(events) == 1:
+        return _process_single_event(session, events[0], settings, already_processed=already_processed)
+
+    event_type = events[0].event_type
+    tracer = trace.get_tracer("qhse.worker")
+    t1 = time.time()
+    try:
+        with tracer.start_as_current_span("worker.process_batch", links=_trace_links(events)) as span:
+            span.set_attribute("event_type", event_type)
+            span.set_attribute("event_count", len(events))
+            with projection_scope(session), session.begin_nested():
+                get_handler(event_type)(session, [decode_payload(ev) for ev in events])
+                for ev in events:
+                    _mark_done(ev)
+    except Exception:
+        logger.warning(
+            "batch handler failed; retrying events one by one",
+            extra={"event_type": event_type, "count": len(events)},
+            exc_info=True,
+        )
+        return sum(
+            _process_single_event(session, ev, settings, already_processed=already_processed)
+            for ev in events
+        )
+
+    per_event_sec = (time.time() - t1) / len(events)
+    worker_jobs_processed_total.labels(status="success", event_type=event_type).inc(len(events))
+    for _ in events:
+        worker_job_duration_seconds.labels(event_type=event_type).observe(per_event_sec)
+    return len(events)
+
+
+def _process_batch_single_tx(batch: int, worker_id: str, settings) -> tuple[int, int]:
+    """
+    Claim and process a whole batch inside one transaction (one commit per batch).
+
+    Rows loaded by the claim are reused as-is. Events are grouped by type and each group goes
+    to its batch handler in one call (see _process_event_group); with ordered partitions a claim
+    holds at most one event per aggregate, so grouping never reorders an aggregate's events.
+    The claimed rows stay locked (FOR UPDATE) until the final commit.
+    Idempotency is resolved for the whole batch: one IN (...) lookup, one multi-row insert.
+    """
+    processed = 0
+    with get_session() as session:
+        events = claim_outbox_events(
+            session,
+            limit=batch,
+            worker_id=worker_id,
+            lock_timeout_sec=settings.OUTBOX_LOCK_TIMEOUT_SEC,
+        )
+        if not events:
+            return 0, 0
+
+        already = fetch_processed_event_ids(session, (ev.event_id for ev in events))
+
+        groups: dict[str, list[OutboxEvent]] = {}
+        for ev in events:
+            if ev.event_id in already:
+                processed += _process_single_event(session, ev, settings, already_processed=already)
+            else:
+                groups.setdefault(ev.event_type, []).append(ev)
+
+        for group in groups.values():
+            processed += _process_event_group(session, group, settings, already_processed=already)
+
+        # Only events whose SAVEPOINT was released are DONE (a rollback reloads them as PROCESSING).
+        mark_processed_bulk(
+            session,
+            (ev.event_id for ev in events if ev.status == "DONE" and ev.event_id not in already),
+        )
+    return len(events), processed
+
+
+def _process_batch_per_event(batch: int, worker_id: str, settings) -> tuple[int, int]:
+    processed = 0
+    event_ids = _claim_batch(batch, worker_id, settings)
+
+    for outbox_id in event_ids:
+        with get_session() as session:
+            ev = session.get(OutboxEvent, outbox_id)
+            if not ev or ev.status != "PROCESSING":
+                continue
+
+            processed += _process_single_event(session, ev, settings)
+
+    return len(event_ids), processed
+
+
+class BatchResult(NamedTuple):
+    claimed: int
+    processed: int
+    duration_sec: float  # claim + processing
+
+
+def make_worker_id(slot: int = 0) -> str:
+    """Lock identity written to outbox_events.locked_by: host:pid:slot (fits String(64))."""
+    suffix = f":{os.getpid()}:{slot}"
+    return socket.gethostname()[: 64 - len(suffix)] + suffix
+
+
+def run_once(
+    limit: int | None = None,
+    *,
+    single_tx: bool | None = None,
+    worker_id: str | None = None,
+) -> int:
+    """Claim and process one batch; returns the number of successfully processed events."""
+    return run_batch(limit, single_tx=single_tx, worker_id=worker_id).processed
+
+
+def run_batch(
+    limit: int | None = None,
+    *,
+    single_tx: bool | None = None,
+    worker_id: str | None = None,
+) -> BatchResult:
     t0 = time.time()
 
     settings = get_settings()
     batch = limit if limit is not None else settings.OUTBOX_BATCH_SIZE
+    if single_tx is None:
+        single_tx = settings.OUTBOX_BATCH_SINGLE_TX
 
-    processed = 0
-    worker_id = "worker"
+    if worker_id is None:
+        worker_id = make_worker_id()
 
     batch_rid = f"worker:{uuid.uuid4()}"
     set_request_id(batch_rid)
 
     try:
-        event_ids = _claim_batch(batch, worker_id, settings)
-
-        for outbox_id in event_ids:
-            with get_session() as session:
-                ev = session.get(OutboxEvent, outbox_id)
-                if not ev or ev.status != "PROCESSING":
-                    continue
+        if single_tx:
+            claimed, processed = _process_batch_single_tx(batch, worker_id, settings)
+        else:
+            claimed, processed = _process_batch_per_event(batch, worker_id, settings)
 
-                processed += _process_single_event(session, ev, settings)
+        duration_sec = time.time() - t0
 
         if processed == 0:
             worker_poll_iterations_total.labels(result="empty").inc()
         else:
             worker_poll_iterations_total.labels(result="ok").inc()
 
-        # Outbox health (one query per loop)
-        with get_session() as session:
-            q = session.query(OutboxEvent).filter(OutboxEvent.status.in_(["PENDING", "PROCESSING"]))
-            outbox_unprocessed_total.set(q.count())
-
-            oldest = q.order_by(OutboxEvent.created_at.asc()).first()
-            if oldest and oldest.created_at:
-                now = datetime.now(timezone.utc)
-                created = _as_utc_aware(oldest.created_at)
-                age = (now - created).total_seconds()
-                outbox_oldest_unprocessed_age_seconds.set(age)
-            else:
-                outbox_oldest_unprocessed_age_seconds.set(0)
-
-        return processed
+        return BatchResult(claimed=claimed, processed=processed, duration_sec=duration_sec)
 
     finally:
         worker_poll_duration_seconds.observe(time.time() - t0)
         set_request_id(None)
 
 
-def main() -> None:
+class AdaptiveBatchController:
+    """
+    Picks the claim size and the idle wait for the next loop iteration.
+
+    - full batch (backlog remains): no wait; grow the claim size (x2) while jobs stay fast
+    - average job latency above target: halve the claim size (rows stay locked for less)
+    - partial batch: backlog drained, wait the minimum idle interval
+    - empty batch: exponential backoff of the idle interval, up to idle_max_sec
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        min_size: int,
+        max_size: int,
+        target_job_sec: float,
+        idle_min_sec: float,
+        idle_max_sec: float,
+        slot: int = 0,
+    ):
+        self.slot = slot
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.target_job_sec = target_job_sec
+        self.idle_min_sec = idle_min_sec
+        self.idle_max_sec = max(idle_min_sec, idle_max_sec)
+
+        self.batch_size = min(self.max_size, max(self.min_size, initial))
+        self.idle_sec = 0.0
+        self._export()
+
+    @classmethod
+    def from_settings(cls, settings, *, slot: int = 0) -> "AdaptiveBatchController":
+        return cls(
+            slot=slot,
+            initial=settings.OUTBOX_BATCH_SIZE,
+            min_size=settings.OUTBOX_BATCH_SIZE_MIN,
+            max_size=settings.OUTBOX_BATCH_SIZE_MAX,
+            target_job_sec=settings.OUTBOX_TARGET_JOB_SEC,
+            idle_min_sec=settings.OUTBOX_POLL_INTERVAL_SEC,
+            idle_max_sec=settings.OUTBOX_IDLE_MAX_SEC,
+        )
+
+    def observe(self, result: BatchResult) -> float:
+        """Feed the last batch outcome; returns how long to wait before the next one."""
+        full = result.claimed >= self.batch_size
+        job_sec = result.duration_sec / result.claimed if result.claimed else 0.0
+
+        if result.claimed and job_sec > self.target_job_sec:
+            self.batch_size = max(self.min_size, self.batch_size // 2)
+        elif full:
+            self.batch_size = min(self.max_size, self.batch_size * 2)
+
+        if full:
+            self.idle_sec = 0.0
+        elif result.claimed:
+            self.idle_sec = self.idle_min_sec
+        elif self.idle_sec <= 0:
+            self.idle_sec = self.idle_min_sec
+        else:
+            self.idle_sec = min(self.idle_max_sec, self.idle_sec * 2)
+
+        self._export()
+        return self.idle_sec
+
+    def _export(self) -> None:
+        worker_batch_size.labels(slot=str(self.slot)).set(self.batch_size)
+        worker_idle_interval_seconds.labels(slot=str(self.slot)).set(self.idle_sec)
+
+
+# Upper bound for a single blocking wait, so a stop request is honoured quickly
+_STOP_CHECK_SEC = 1.0
+
+
+def _idle_wait(listener: OutboxListener | None, stop: threading.Event, wait_sec: float) -> None:
+    deadline = time.monotonic() + wait_sec
+
+    while not stop.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+
+        if listener is None:
+            stop.wait(remaining)
+            return
+
+        if listener.wait(min(remaining, _STOP_CHECK_SEC)):
+            return
+
+
+def worker_loop(slot: int, stop: threading.Event, settings) -> None:
+    """
+    One claim/process loop. Several can run in the same process (see --concurrency):
+    each has its own lock identity, adaptive controller and LISTEN connection,
+    while Prometheus metrics go to the shared process-wide registry.
+
+    Stops between batches once `stop` is set, so an in-flight batch is always committed.
+    """
+    worker_id = make_worker_id(slot)
+    tracer = trace.get_tracer("qhse.worker")
+
+    # LISTEN before the first claim, so nothing committed in between is missed
+    listener = OutboxListener.from_settings().connect() if settings.OUTBOX_NOTIFY_ENABLED else None
+    controller = AdaptiveBatchController.from_settings(settings, slot=slot)
+
+    logger.info("worker loop starting", extra={"status": "starting", "worker_id": worker_id})
+
+    try:
+        while not stop.is_set():
+            with tracer.start_as_current_span("worker.loop"):
+                try:
+                    result = run_batch(controller.batch_size, worker_id=worker_id)
+                except Exception:
+                    worker_poll_iterations_total.labels(result="error").inc()
+                    raise
+                else:
+                    if result.processed:
+                        logger.info("batch processed", extra={"status": "processed", "count": result.processed})
+
+            wait_sec = controller.observe(result)
+
+            # Backlog remains: drain back-to-back, no waiting
+            if wait_sec <= 0:
+                continue
+
+            _idle_wait(listener, stop, wait_sec)
+    finally:
+        if listener is not None:
+            listener.close()
+        logger.info("worker loop stopped", extra={"status": "stopped", "worker_id": worker_id})
+
+
+def run_pool(concurrency: int, stop: threading.Event, settings) -> None:
+    """
+    Run `concurrency` worker loops as threads and wait for them.
+
+    If one loop crashes, the others are asked to drain and the first error is re-raised,
+    so the process exits non-zero like the single-loop worker.
+    """
+    errors: list[BaseException] = []
+
+    def _run(slot: int) -> None:
+        try:
+            worker_loop(slot, stop, settings)
+        except BaseException as e:
+            logger.exception("worker loop crashed")
+            errors.append(e)
+            stop.set()
+
+    threads = [
+        threading.Thread(target=_run, args=(slot,), name=f"worker-{slot}", daemon=True)
+        for slot in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+
+    # join with a timeout: keeps the main thread responsive to signals
+    while any(t.is_alive() for t in threads):
+        for t in threads:
+            t.join(timeout=0.5)
+
+    if errors:
+        raise errors[0]
+
+
+def _parse_args(argv: list[str] | None, settings) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="Outbox worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.WORKER_CONCURRENCY,
+        help="number of claim/process loops in this process (default: WORKER_CONCURRENCY)",
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be >= 1")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
     settings = get_settings()
+    args = _parse_args(argv, settings)
 
     # 1) logging prima (perché configure_logging() resetta gli handler)
     configure_logging(level=settings.LOG_LEVEL, json_logs=settings.LOG_JSON)
@@ -312,22 +859,23 @@ def main() -> None:
     start_http_server(metrics_port)
     logger.info("worker metrics server started", extra={"port": metrics_port})
 
-    logger.info("worker starting", extra={"status": "starting"})
+    logger.info("worker starting", extra={"status": "starting", "count": args.concurrency})
 
-    from opentelemetry import trace
-    tracer = trace.get_tracer("qhse.worker")
+    # 4) graceful drain: finish the in-flight batch, then exit
+    stop = threading.Event()
 
-    while True:
-        with tracer.start_as_current_span("worker.loop"):
-            try:
-                n = run_once()
-            except Exception:
-                worker_poll_iterations_total.labels(result="error").inc()
-                raise
-            else:
-                if n:
-                    logger.info("batch processed", extra={"status": "processed", "count": n})
-        time.sleep(1.0)
+    def _request_stop(signum, _frame) -> None:
+        logger.info("stop requested, draining", extra={"status": "draining"})
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    # Outbox health gauges: own interval, decoupled from the processing loops
+    start_health_sampler(stop, settings)
+
+    run_pool(args.concurrency, stop, settings)
+    logger.info("worker stopped", extra={"status": "stopped"})
 
 
 if __name__ == "__main__":
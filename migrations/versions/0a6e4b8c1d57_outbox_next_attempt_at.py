@@ -0,0 +1,27 @@
+"""outbox next_attempt_at
+
+Revision ID: 0a6e4b8c1d57
+Revises: f7b2c9d04e13
+Create Date: 2026-10-17 12:41:19.774210
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6e4b8c1d57'
+down_revision: Union[str, Sequence[str], None] = 'f7b2c9d04e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL = claimable right away (all existing rows)
+    op.add_column("outbox_events", sa.Column("next_attempt_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("outbox_events", "next_attempt_at")
@@ -0,0 +1,74 @@
+"""supplier stats
+
+Revision ID: 2b8c4e7f9a16
+Revises: 9d2e6f1a3c74
+Create Date: 2026-10-17 17:03:12.448915
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b8c4e7f9a16'
+down_revision: Union[str, Sequence[str], None] = '9d2e6f1a3c74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "supplier_stats",
+        sa.Column("supplier_id", sa.Integer(), nullable=False),
+        sa.Column("nc_total", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("nc_open", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("nc_open_high", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_nc_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["supplier_id"], ["suppliers.id"]),
+        sa.PrimaryKeyConstraint("supplier_id"),
+    )
+
+    # Initial build (same statement as app.events.supplier_stats.rebuild_supplier_stats):
+    # NC events still in the outbox will be applied by the handlers, so their NCs are
+    # counted as the handlers expect to find them (not yet created / still OPEN).
+    op.execute(
+        """
+        WITH live AS (
+            SELECT
+                event_type,
+                (payload_json::jsonb ->> 'nc_id')::int AS nc_id,
+                coalesce(payload_json::jsonb ->> 'previous_status', 'OPEN') AS previous_status
+            FROM outbox_events
+            WHERE status IN ('PENDING', 'PROCESSING')
+              AND event_type IN ('NC_CREATED', 'NC_CLOSED')
+        ),
+        ncs AS (
+            SELECT
+                supplier_id,
+                severity,
+                created_at,
+                status = 'OPEN' OR id IN (
+                    SELECT nc_id FROM live WHERE event_type = 'NC_CLOSED' AND previous_status = 'OPEN'
+                ) AS is_open
+            FROM nonconformities
+            WHERE id NOT IN (SELECT nc_id FROM live WHERE event_type = 'NC_CREATED')
+        )
+        INSERT INTO supplier_stats (supplier_id, nc_total, nc_open, nc_open_high, last_nc_at, updated_at)
+        SELECT
+            supplier_id,
+            count(*),
+            count(*) FILTER (WHERE is_open),
+            count(*) FILTER (WHERE is_open AND severity = 'high'),
+            max(created_at),
+            now() AT TIME ZONE 'utc'
+        FROM ncs
+        GROUP BY supplier_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("supplier_stats")
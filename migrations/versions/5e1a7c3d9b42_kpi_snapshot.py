@@ -0,0 +1,39 @@
+"""kpi snapshot
+
+Revision ID: 5e1a7c3d9b42
+Revises: 2b8c4e7f9a16
+Create Date: 2026-10-17 18:21:47.603118
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a7c3d9b42'
+down_revision: Union[str, Sequence[str], None] = '2b8c4e7f9a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Single row (id=1); built on the first GET /kpi (or `make kpi-snapshot`)
+    op.create_table(
+        "kpi_snapshot",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("nc_open", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("nc_open_high", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("nc_closed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("suppliers_at_risk", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("audit_events_total", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("as_of_date", sa.Date(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("kpi_snapshot")
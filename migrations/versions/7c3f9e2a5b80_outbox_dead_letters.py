@@ -0,0 +1,81 @@
+"""outbox dead letters
+
+Revision ID: 7c3f9e2a5b80
+Revises: 0a6e4b8c1d57
+Create Date: 2026-10-17 14:05:33.208517
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f9e2a5b80'
+down_revision: Union[str, Sequence[str], None] = '0a6e4b8c1d57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("outbox_events", sa.Column("error_history_json", sa.Text(), nullable=True))
+
+    op.create_table(
+        "outbox_dead_letters",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("outbox_id", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.String(length=64), nullable=False),
+        sa.Column("event_type", sa.String(length=100), nullable=False),
+        sa.Column("payload_json", sa.Text(), nullable=False),
+        sa.Column("meta_json", sa.Text(), server_default=sa.text("'{}'"), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=False),
+        sa.Column("traceback_digest", sa.String(length=64), nullable=True),
+        sa.Column("attempt_history_json", sa.Text(), server_default=sa.text("'[]'"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("failed_at", sa.DateTime(), nullable=False),
+        sa.Column("replayed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_dead_letters_event_id", "outbox_dead_letters", ["event_id"], unique=False)
+    op.create_index("ix_dead_letters_event_type_id", "outbox_dead_letters", ["event_type", "id"], unique=False)
+    op.create_index(
+        "ix_dead_letters_unreplayed",
+        "outbox_dead_letters",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("replayed_at IS NULL"),
+    )
+
+    # Existing FAILED rows leave the hot table (no error details were recorded for them)
+    op.execute(
+        """
+        WITH moved AS (
+            DELETE FROM outbox_events WHERE status = 'FAILED'
+            RETURNING id, event_id, event_type, payload_json, meta_json, attempts, created_at, processed_at
+        )
+        INSERT INTO outbox_dead_letters
+            (outbox_id, event_id, event_type, payload_json, meta_json, attempts, last_error, created_at, failed_at)
+        SELECT id, event_id, event_type, payload_json, meta_json, attempts, 'unknown (failed before dead-letter store)',
+               created_at, COALESCE(processed_at, now() AT TIME ZONE 'utc')
+        FROM moved ORDER BY id
+        """
+    )
+
+
+def downgrade() -> None:
+    # Unreplayed dead letters go back to outbox_events as FAILED
+    op.execute(
+        """
+        INSERT INTO outbox_events (event_id, event_type, payload_json, meta_json, status, attempts, created_at)
+        SELECT event_id, event_type, payload_json, meta_json, 'FAILED', attempts, created_at
+        FROM outbox_dead_letters WHERE replayed_at IS NULL
+        ON CONFLICT (event_id) DO NOTHING
+        """
+    )
+    op.drop_index("ix_dead_letters_unreplayed", table_name="outbox_dead_letters")
+    op.drop_index("ix_dead_letters_event_type_id", table_name="outbox_dead_letters")
+    op.drop_index("ix_dead_letters_event_id", table_name="outbox_dead_letters")
+    op.drop_table("outbox_dead_letters")
+    op.drop_column("outbox_events", "error_history_json")
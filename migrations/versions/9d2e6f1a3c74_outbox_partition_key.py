@@ -0,0 +1,50 @@
+"""outbox partition key
+
+Revision ID: 9d2e6f1a3c74
+Revises: 7c3f9e2a5b80
+Create Date: 2026-10-17 15:22:47.610392
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2e6f1a3c74'
+down_revision: Union[str, Sequence[str], None] = '7c3f9e2a5b80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("outbox_events", sa.Column("partition_key", sa.String(length=100), nullable=True))
+    op.add_column("outbox_dead_letters", sa.Column("partition_key", sa.String(length=100), nullable=True))
+
+    # Backfill live rows only (same rule as app.events.outbox.partition_key_for); DONE rows never
+    # take part in the ordered claim.
+    op.execute(
+        """
+        UPDATE outbox_events
+        SET partition_key = CASE
+            WHEN payload_json::jsonb ? 'nc_id' THEN 'nc:' || (payload_json::jsonb ->> 'nc_id')
+            WHEN payload_json::jsonb ? 'supplier_id' THEN 'supplier:' || (payload_json::jsonb ->> 'supplier_id')
+        END
+        WHERE status IN ('PENDING', 'PROCESSING')
+        """
+    )
+
+    op.create_index(
+        "ix_outbox_partition_live",
+        "outbox_events",
+        ["partition_key", "id"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING') AND partition_key IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_partition_live", table_name="outbox_events")
+    op.drop_column("outbox_dead_letters", "partition_key")
+    op.drop_column("outbox_events", "partition_key")
@@ -0,0 +1,48 @@
+"""supplier_stats: certification_expiry, one row per supplier
+
+Revision ID: a9e3c5d7f102
+Revises: f3c9a1e5b726
+Create Date: 2026-10-18 11:47:05.913204
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e3c5d7f102'
+down_revision: Union[str, Sequence[str], None] = 'f3c9a1e5b726'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # "At risk" for GET /kpi is computed from supplier_stats alone: the certification is kept
+    # there as applied by the SUPPLIER_CERT_UPDATED handler, next to nc_open_high.
+    op.add_column("supplier_stats", sa.Column("certification_expiry", sa.Date(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE supplier_stats st
+        SET certification_expiry = s.certification_expiry
+        FROM suppliers s
+        WHERE s.id = st.supplier_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO supplier_stats (supplier_id, nc_total, nc_open, nc_open_high, certification_expiry, updated_at)
+        SELECT s.id, 0, 0, 0, s.certification_expiry, now() AT TIME ZONE 'utc'
+        FROM suppliers s
+        WHERE NOT EXISTS (SELECT 1 FROM supplier_stats st WHERE st.supplier_id = s.id)
+        """
+    )
+
+    # suppliers_at_risk was counted from suppliers: recount it from supplier_stats on the next read
+    op.execute("UPDATE kpi_snapshot SET as_of_date = DATE '1970-01-01'")
+
+
+def downgrade() -> None:
+    op.drop_column("supplier_stats", "certification_expiry")
@@ -0,0 +1,58 @@
+"""supplier certification_expiry as date
+
+Revision ID: b3f7e1d5a820
+Revises: 5e1a7c3d9b42
+Create Date: 2026-10-17 19:40:52.119463
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7e1d5a820'
+down_revision: Union[str, Sequence[str], None] = '5e1a7c3d9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backfill in the type change: "YYYY-MM-DD" strings become dates; anything else ("" or
+    # not a real date, the API never validated it) becomes NULL instead of failing the migration.
+    op.execute(
+        r"""
+        CREATE FUNCTION pg_temp.iso_date_or_null(s text) RETURNS date AS $$
+        BEGIN
+            IF s ~ '^\d{4}-\d{2}-\d{2}$' THEN
+                RETURN to_date(s, 'YYYY-MM-DD');
+            END IF;
+            RETURN NULL;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.alter_column(
+        "suppliers",
+        "certification_expiry",
+        existing_type=sa.String(length=10),
+        type_=sa.Date(),
+        existing_nullable=True,
+        postgresql_using="pg_temp.iso_date_or_null(certification_expiry)",
+    )
+    op.create_index("ix_suppliers_certification_expiry", "suppliers", ["certification_expiry"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_suppliers_certification_expiry", table_name="suppliers")
+    op.alter_column(
+        "suppliers",
+        "certification_expiry",
+        existing_type=sa.Date(),
+        type_=sa.String(length=10),
+        existing_nullable=True,
+        postgresql_using="to_char(certification_expiry, 'YYYY-MM-DD')",
+    )
@@ -0,0 +1,33 @@
+"""outbox unprocessed partial index
+
+Revision ID: c4d1e7a9b2f0
+Revises: b8fb9ff34626
+Create Date: 2026-10-17 09:12:04.118402
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d1e7a9b2f0'
+down_revision: Union[str, Sequence[str], None] = 'b8fb9ff34626'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only PENDING/PROCESSING rows: stays small no matter how many DONE rows accumulate
+    op.create_index(
+        "ix_outbox_unprocessed_created_at",
+        "outbox_events",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_unprocessed_created_at", table_name="outbox_events")
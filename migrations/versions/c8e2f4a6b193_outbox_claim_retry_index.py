@@ -0,0 +1,50 @@
+"""outbox claim: separate index for PENDING rows waiting for a retry
+
+Revision ID: c8e2f4a6b193
+Revises: a9e3c5d7f102
+Create Date: 2026-10-18 14:06:51.270844
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2f4a6b193'
+down_revision: Union[str, Sequence[str], None] = 'a9e3c5d7f102'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The pending claim branch walked every PENDING row in id order, backed-off ones included.
+    # Never attempted rows keep the id order; retries are found by next_attempt_at range.
+    op.drop_index("ix_outbox_claim_pending", table_name="outbox_events")
+    op.create_index(
+        "ix_outbox_claim_pending",
+        "outbox_events",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING' AND next_attempt_at IS NULL"),
+    )
+    op.create_index(
+        "ix_outbox_claim_retry",
+        "outbox_events",
+        ["next_attempt_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING' AND next_attempt_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_claim_retry", table_name="outbox_events")
+    op.drop_index("ix_outbox_claim_pending", table_name="outbox_events")
+    op.create_index(
+        "ix_outbox_claim_pending",
+        "outbox_events",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
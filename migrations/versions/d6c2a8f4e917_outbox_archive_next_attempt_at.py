@@ -0,0 +1,28 @@
+"""outbox archive: next_attempt_at
+
+Revision ID: d6c2a8f4e917
+Revises: b3f7e1d5a820
+Create Date: 2026-10-18 09:12:40.337125
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6c2a8f4e917'
+down_revision: Union[str, Sequence[str], None] = 'b3f7e1d5a820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Retention copies every archive column from outbox_events: keep the two tables aligned.
+    # Rows archived before this revision are left NULL (the value was dropped on archive).
+    op.add_column("outbox_events_archive", sa.Column("next_attempt_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("outbox_events_archive", "next_attempt_at")
@@ -0,0 +1,28 @@
+"""outbox archive: error_history_json
+
+Revision ID: e1b7d3f9a045
+Revises: d6c2a8f4e917
+Create Date: 2026-10-18 09:14:02.581930
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7d3f9a045'
+down_revision: Union[str, Sequence[str], None] = 'd6c2a8f4e917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Retention copies every archive column from outbox_events: keep the two tables aligned.
+    # Rows archived before this revision are left NULL (the value was dropped on archive).
+    op.add_column("outbox_events_archive", sa.Column("error_history_json", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("outbox_events_archive", "error_history_json")
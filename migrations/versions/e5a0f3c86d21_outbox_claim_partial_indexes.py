@@ -0,0 +1,49 @@
+"""outbox claim partial indexes
+
+Revision ID: e5a0f3c86d21
+Revises: c4d1e7a9b2f0
+Create Date: 2026-10-17 10:03:41.552917
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0f3c86d21'
+down_revision: Union[str, Sequence[str], None] = 'c4d1e7a9b2f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One partial index per claim branch: DONE/FAILED rows never enter them.
+    op.create_index(
+        "ix_outbox_claim_pending",
+        "outbox_events",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        "ix_outbox_claim_processing",
+        "outbox_events",
+        ["id", "locked_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PROCESSING'"),
+    )
+    # Superseded by ix_outbox_claim_processing (and it indexed every DONE row too)
+    op.drop_index("ix_outbox_status_locked_at", table_name="outbox_events")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_outbox_status_locked_at",
+        "outbox_events",
+        ["status", "locked_at"],
+        unique=False,
+    )
+    op.drop_index("ix_outbox_claim_processing", table_name="outbox_events")
+    op.drop_index("ix_outbox_claim_pending", table_name="outbox_events")
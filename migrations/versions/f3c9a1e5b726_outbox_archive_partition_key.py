@@ -0,0 +1,28 @@
+"""outbox archive: partition_key
+
+Revision ID: f3c9a1e5b726
+Revises: e1b7d3f9a045
+Create Date: 2026-10-18 09:15:27.104468
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a1e5b726'
+down_revision: Union[str, Sequence[str], None] = 'e1b7d3f9a045'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Retention copies every archive column from outbox_events: keep the two tables aligned.
+    # Rows archived before this revision are left NULL (the value was dropped on archive).
+    op.add_column("outbox_events_archive", sa.Column("partition_key", sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("outbox_events_archive", "partition_key")
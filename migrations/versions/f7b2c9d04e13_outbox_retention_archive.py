@@ -0,0 +1,49 @@
+"""outbox retention archive
+
+Revision ID: f7b2c9d04e13
+Revises: e5a0f3c86d21
+Create Date: 2026-10-17 11:20:57.301664
+
+"""
+import sqlalchemy as sa
+
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b2c9d04e13'
+down_revision: Union[str, Sequence[str], None] = 'e5a0f3c86d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_events_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("event_id", sa.String(length=64), nullable=False),
+        sa.Column("event_type", sa.String(length=100), nullable=False),
+        sa.Column("payload_json", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("meta_json", sa.Text(), server_default=sa.text("'{}'"), nullable=False),
+        sa.Column("locked_by", sa.String(length=64), nullable=True),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), server_default=sa.text("(now() AT TIME ZONE 'utc')"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_outbox_archive_event_id", "outbox_events_archive", ["event_id"], unique=False)
+    op.create_index("ix_outbox_archive_created_at", "outbox_events_archive", ["created_at"], unique=False)
+
+    # processed_events pruning scans by age
+    op.create_index("ix_processed_processed_at", "processed_events", ["processed_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_processed_processed_at", table_name="processed_events")
+    op.drop_index("ix_outbox_archive_created_at", table_name="outbox_events_archive")
+    op.drop_index("ix_outbox_archive_event_id", table_name="outbox_events_archive")
+    op.drop_table("outbox_events_archive")
@@ -0,0 +1,218 @@
+"""
+HTTP load test for the API (asyncio + httpx).
+
+Virtual users log in as the STATIC_USERS roles and loop over a weighted request mix per role
+(only routes the role is allowed to call) for --duration seconds. The report gives throughput
+and p50/p95/p99 per route, keyed like the http_request_duration_seconds labels
+(method + route template, e.g. "GET /suppliers/{supplier_id}").
+
+Usage (API running, e.g. `make up`, data from scripts/seed_load_data.py):
+
+    PYTHONPATH=. python scripts/loadtest.py --base-url http://127.0.0.1:8000 \
+        --users 20 --duration 60 --roles quality,procurement,auditor,admin
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable
+
+import httpx
+
+from app.auth import STATIC_USERS
+
+
+@dataclass(frozen=True)
+class Step:
+    weight: int
+    method: str
+    route: str  # template, as in the http_request_duration_seconds "route" label
+    build: Callable[["Pools"], tuple[str, dict | None]]  # -> (path, json body)
+
+
+@dataclass
+class Pools:
+    """Ids discovered at startup, sampled to build realistic paths."""
+
+    supplier_ids: list[int] = field(default_factory=list)
+    open_nc_ids: list[int] = field(default_factory=list)
+
+
+def _const(path: str) -> Callable[[Pools], tuple[str, dict | None]]:
+    return lambda _pools: (path, None)
+
+
+def _supplier_detail(pools: Pools) -> tuple[str, dict | None]:
+    return f"/suppliers/{random.choice(pools.supplier_ids)}", None
+
+
+def _list_ncs(_pools: Pools) -> tuple[str, dict | None]:
+    params = random.choice(("", "?status=OPEN", "?severity=high", "?status=OPEN&severity=high"))
+    return f"/ncs{params}", None
+
+
+def _create_nc(pools: Pools) -> tuple[str, dict | None]:
+    body = {
+        "supplier_id": random.choice(pools.supplier_ids),
+        "severity": random.choice(("low", "low", "medium", "high")),
+        "description": "loadtest NC",
+    }
+    return "/ncs", body
+
+
+def _close_nc(pools: Pools) -> tuple[str, dict | None]:
+    return f"/ncs/{random.choice(pools.open_nc_ids)}/close", None
+
+
+def _update_cert(pools: Pools) -> tuple[str, dict | None]:
+    return f"/suppliers/{random.choice(pools.supplier_ids)}/certification", {"certification_expiry": "2027-12-31"}
+
+
+def _expiring_suppliers(_pools: Pools) -> tuple[str, dict | None]:
+    days = random.choice((0, 30, 90))
+    return f"/suppliers?limit=50&expiring_before={date.today() + timedelta(days=days)}", None
+
+
+def _audit_page(_pools: Pools) -> tuple[str, dict | None]:
+    return f"/audit-log?limit=50&offset={random.choice((0, 0, 0, 50, 500))}", None
+
+
+# Per-role request mix (weights are relative within a role)
+PROFILES: dict[str, list[Step]] = {
+    "quality": [
+        Step(40, "GET", "/ncs", _list_ncs),
+        Step(20, "GET", "/suppliers", _const("/suppliers?limit=50")),
+        Step(20, "GET", "/suppliers/{supplier_id}", _supplier_detail),
+        Step(10, "GET", "/kpi", _const("/kpi")),
+        Step(7, "POST", "/ncs", _create_nc),
+        Step(3, "PATCH", "/ncs/{nc_id}/close", _close_nc),
+    ],
+    "procurement": [
+        Step(40, "GET", "/suppliers", _const("/suppliers?limit=50")),
+        Step(10, "GET", "/suppliers", _expiring_suppliers),
+        Step(30, "GET", "/suppliers/{supplier_id}", _supplier_detail),
+        Step(15, "GET", "/ncs", _list_ncs),
+        Step(5, "PATCH", "/suppliers/{supplier_id}/certification", _update_cert),
+    ],
+    "auditor": [
+        Step(40, "GET", "/audit-log", _audit_page),
+        Step(25, "GET", "/ncs", _list_ncs),
+        Step(20, "GET", "/kpi", _const("/kpi")),
+        Step(15, "GET", "/suppliers", _const("/suppliers?limit=50")),
+    ],
+    "admin": [
+        Step(30, "GET", "/kpi", _const("/kpi")),
+        Step(20, "GET", "/audit-log", _audit_page),
+        Step(20, "GET", "/suppliers/{supplier_id}", _supplier_detail),
+        Step(20, "GET", "/ncs", _list_ncs),
+        Step(10, "GET", "/admin/dead-letters", _const("/admin/dead-letters")),
+    ],
+}
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+async def _login(client: httpx.AsyncClient, username: str) -> dict[str, str]:
+    r = await client.post("/auth/login", json={"username": username, "password": STATIC_USERS[username]["password"]})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def _discover(client: httpx.AsyncClient, headers: dict[str, str]) -> Pools:
+    suppliers = (await client.get("/suppliers?limit=100", headers=headers)).json()
+    ncs = (await client.get("/ncs?limit=100&status=OPEN", headers=headers)).json()
+    pools = Pools(supplier_ids=[s["id"] for s in suppliers], open_nc_ids=[n["id"] for n in ncs])
+    if not pools.supplier_ids or not pools.open_nc_ids:
+        raise SystemExit("no suppliers / open NCs found: run scripts/seed_load_data.py first")
+    return pools
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    steps: list[Step],
+    pools: Pools,
+    stats: dict[str, RouteStats],
+    deadline: float,
+) -> None:
+    weights = [s.weight for s in steps]
+    while time.monotonic() < deadline:
+        step = random.choices(steps, weights=weights)[0]
+        path, body = step.build(pools)
+
+        t0 = time.perf_counter()
+        try:
+            r = await client.request(step.method, path, headers=headers, json=body)
+            failed = r.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        route_stats = stats.setdefault(f"{step.method} {step.route}", RouteStats())
+        route_stats.latencies_ms.append(elapsed_ms)
+        route_stats.errors += failed
+
+
+def _report(stats: dict[str, RouteStats], elapsed: float) -> None:
+    print(f"{'route':<46} {'count':>7} {'err':>5} {'rps':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}")
+    total = 0
+    for key in sorted(stats):
+        lat = stats[key].latencies_ms
+        total += len(lat)
+        qs = statistics.quantiles(lat, n=100, method="inclusive") if len(lat) > 1 else [lat[0]] * 99
+        print(
+            f"{key:<46} {len(lat):>7} {stats[key].errors:>5} {len(lat) / elapsed:>8.1f} "
+            f"{statistics.median(lat):>8.2f} {qs[94]:>8.2f} {qs[98]:>8.2f}"
+        )
+    print(f"total {total} requests in {elapsed:.1f}s -> {total / elapsed:.1f} req/s")
+
+
+async def run(base_url: str, *, users: int, duration: float, roles: list[str]) -> None:
+    stats: dict[str, RouteStats] = {}
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits) as client:
+        headers = {role: await _login(client, role) for role in roles}
+        pools = await _discover(client, headers["admin"] if "admin" in headers else next(iter(headers.values())))
+
+        deadline = time.monotonic() + duration
+        t0 = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _virtual_user(client, headers[role], PROFILES[role], pools, stats, deadline)
+                for role in (roles[i % len(roles)] for i in range(users))
+            )
+        )
+        elapsed = time.perf_counter() - t0
+
+    _report(stats, elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users (round-robin over --roles)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--roles", default=",".join(PROFILES), help="comma-separated STATIC_USERS roles")
+    args = parser.parse_args()
+
+    roles = [r.strip() for r in args.roles.split(",") if r.strip()]
+    unknown = [r for r in roles if r not in PROFILES or r not in STATIC_USERS]
+    if unknown:
+        parser.error(f"unknown roles: {', '.join(unknown)}")
+
+    asyncio.run(run(args.base_url, users=args.users, duration=args.duration, roles=roles))
+
+
+if __name__ == "__main__":
+    main()
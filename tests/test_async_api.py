@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from app.db import dispose_async_engine, get_session
+from app.events.supplier_stats import rebuild_supplier_stats
+from app.main import app
+from app.models import NonConformity, Supplier
+from tests.utils_auth import auth_headers, login_and_get_token
+
+
+def test_async_read_routes_serve_concurrent_requests(client):
+    with get_session() as s:
+        sup = Supplier(name="ACME-async", certification_expiry=None)
+        s.add(sup)
+        s.flush()
+        s.add(NonConformity(supplier_id=sup.id, severity="high", status="OPEN", description="x"))
+        s.flush()
+        rebuild_supplier_stats(s)
+        supplier_id = sup.id
+
+    headers = auth_headers(login_and_get_token(client, "admin", "admin"))
+    paths = ["/kpi", "/suppliers", f"/suppliers/{supplier_id}", "/ncs", "/audit-log"] * 4
+
+    async def _gather():
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                return await asyncio.gather(*(ac.get(p, headers=headers) for p in paths))
+        finally:
+            await dispose_async_engine()
+
+    responses = asyncio.run(_gather())
+
+    assert [r.status_code for r in responses] == [200] * len(paths)
+    kpi = responses[0].json()
+    assert kpi["nc_open_high"] == 1
+    assert kpi["suppliers_at_risk"] == 1
+    assert responses[2].json()["is_at_risk"] is True
+
+
+def test_async_supplier_detail_404(client):
+    headers = auth_headers(login_and_get_token(client, "auditor", "auditor"))
+    r = client.get("/suppliers/999999", headers=headers)
+    assert r.status_code == 404, r.text
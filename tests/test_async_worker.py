@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+
+from app.async_worker import run_once_async
+from app.db import dispose_async_engine, get_session
+from app.models import AuditLog, OutboxEvent, ProcessedEvent
+
+
+def _run(coro):
+    async def _wrapped():
+        try:
+            return await coro
+        finally:
+            await dispose_async_engine()
+
+    return asyncio.run(_wrapped())
+
+
+def test_async_worker_processes_batch_concurrently_and_isolates_failures():
+    with get_session() as s:
+        for i in range(5):
+            s.add(
+                OutboxEvent(
+                    event_id=str(uuid.uuid4()),
+                    event_type="NC_CREATED",
+                    payload_json=json.dumps({"nc_id": i}),
+                    status="PENDING",
+                    attempts=0,
+                )
+            )
+        s.add(
+            OutboxEvent(
+                event_id=str(uuid.uuid4()),
+                event_type="SOMETHING_UNKNOWN",
+                payload_json="{}",
+                status="PENDING",
+                attempts=0,
+            )
+        )
+
+    processed = _run(run_once_async(max_in_flight=3))
+    assert processed == 5
+
+    with get_session() as s:
+        assert s.query(OutboxEvent).filter(OutboxEvent.status == "DONE").count() == 5
+
+        bad = s.query(OutboxEvent).filter(OutboxEvent.event_type == "SOMETHING_UNKNOWN").one()
+        assert bad.status == "PENDING"
+        assert bad.attempts == 1
+
+        assert s.query(ProcessedEvent).count() == 5
+        assert s.query(AuditLog).count() == 5
+
+    # idempotent rerun: nothing left to claim except the poison event
+    assert _run(run_once_async()) == 0
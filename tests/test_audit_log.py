@@ -46,3 +46,24 @@ def test_audit_log_allowed_for_auditor_with_pagination(client):
     data2 = r2.json()
     assert isinstance(data2, list)
     assert len(data2) == 1
+
+
+def test_audit_log_keyset_pagination_walks_every_row_once(client):
+    _seed_audit_logs(5)
+    headers = auth_headers(login_and_get_token(client, "auditor", "auditor"))
+
+    seen: list[int] = []
+    url = "/audit-log?limit=2"
+    while True:
+        r = client.get(url, headers=headers)
+        assert r.status_code == 200, r.text
+        seen += [row["id"] for row in r.json()]
+        next_after_id = r.headers.get("X-Next-After-Id")
+        if next_after_id is None:
+            break
+        url = f"/audit-log?limit=2&after_id={next_after_id}"
+
+    assert seen == [5, 4, 3, 2, 1]  # latest first, no gaps or repeats
+
+    r_both = client.get("/audit-log?offset=2&after_id=3", headers=headers)
+    assert r_both.status_code == 400, r_both.text
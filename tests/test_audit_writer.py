@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from app.audit_utils import write_audit_rows
+from app.db import dispose_async_engine, get_async_session, get_session
+from app.logging_utils import set_request_id
+from app.models import AuditLog
+
+
+def _rows(n: int) -> list[dict]:
+    return [
+        {"action": "BULK", "entity_type": "NonConformity", "entity_id": i, "meta": {"nc_id": i}}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("copy_threshold", [0, 1])  # executemany, COPY
+def test_write_audit_rows(copy_threshold):
+    set_request_id("rid-bulk")
+    try:
+        with get_session() as s:
+            assert write_audit_rows(s, _rows(3), copy_threshold=copy_threshold) == 3
+            assert write_audit_rows(s, [], copy_threshold=copy_threshold) == 0
+    finally:
+        set_request_id(None)
+
+    with get_session() as s:
+        rows = s.query(AuditLog).order_by(AuditLog.id.asc()).all()
+
+    assert [r.entity_id for r in rows] == ["0", "1", "2"]
+    assert all(r.actor == "system" and r.created_at is not None for r in rows)
+    assert json.loads(rows[1].meta_json) == {"nc_id": 1, "request_id": "rid-bulk"}
+
+
+def test_copy_rolls_back_with_the_transaction():
+    with pytest.raises(RuntimeError):
+        with get_session() as s:
+            write_audit_rows(s, _rows(2), copy_threshold=1)
+            raise RuntimeError("boom")
+
+    with get_session() as s:
+        assert s.query(AuditLog).count() == 0
+
+
+def test_async_session_falls_back_to_executemany():
+    async def _write() -> int:
+        try:
+            async with get_async_session() as s:
+                return await s.run_sync(lambda sync_s: write_audit_rows(sync_s, _rows(3), copy_threshold=1))
+        finally:
+            await dispose_async_engine()
+
+    assert asyncio.run(_write()) == 3
+
+    with get_session() as s:
+        assert s.query(AuditLog).count() == 3
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app import db as app_db
+from app.db import get_session
+from app.observability.db_pool import InstrumentedQueuePool
+from app.settings import get_settings
+
+
+def _sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name, {"engine": "sync"}) or 0.0
+
+
+def test_pool_options_come_from_settings():
+    settings = get_settings().model_copy(
+        update={
+            "DB_POOL_SIZE": 3,
+            "DB_MAX_OVERFLOW": 1,
+            "DB_POOL_TIMEOUT_SEC": 2.5,
+            "DB_POOL_RECYCLE_SEC": 60,
+            "DB_POOL_PRE_PING": True,
+        }
+    )
+    engine = create_engine(settings.DATABASE_URL, poolclass=InstrumentedQueuePool, **app_db._pool_options(settings))
+    try:
+        pool = engine.pool
+        assert pool.size() == 3
+        assert pool._max_overflow == 1
+        assert pool._timeout == 2.5
+        assert pool._recycle == 60
+        assert pool._pre_ping is True
+    finally:
+        engine.dispose()
+
+
+def test_pool_metrics_track_checkouts():
+    waits_before = _sample("db_pool_checkout_wait_seconds_count")
+
+    with get_session() as s:
+        s.execute(text("SELECT 1"))
+        assert _sample("db_pool_checked_out_connections") >= 1
+
+    assert _sample("db_pool_checkout_wait_seconds_count") > waits_before
+    assert _sample("db_pool_idle_connections") >= 1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import uuid
+
+import app.services.dead_letter_service as dead_letter_service
+import app.worker as worker
+
+from app.db import get_session
+from app.models import DeadLetterEvent, OutboxEvent
+from app.settings import get_settings
+from tests.utils_auth import auth_headers, login_and_get_token
+
+
+def _dead_letter(event_type: str = "SOMETHING_UNKNOWN") -> str:
+    """Enqueue an event the worker can't handle and drive it to the dead-letter store."""
+    event_uuid = str(uuid.uuid4())
+    with get_session() as s:
+        s.add(
+            OutboxEvent(
+                event_id=event_uuid,
+                event_type=event_type,
+                payload_json="{}",
+                status="PENDING",
+                attempts=get_settings().OUTBOX_MAX_ATTEMPTS - 1,
+            )
+        )
+
+    assert worker.run_once() == 0
+    return event_uuid
+
+
+def test_dead_letters_admin_only(client):
+    token = login_and_get_token(client, "auditor", "auditor")
+    r = client.get("/admin/dead-letters", headers=auth_headers(token))
+    assert r.status_code == 403, r.text
+
+
+def test_dead_letters_keyset_pagination(client):
+    event_ids = [_dead_letter() for _ in range(3)]
+    token = login_and_get_token(client, "admin", "admin")
+
+    r1 = client.get("/admin/dead-letters?limit=2", headers=auth_headers(token))
+    assert r1.status_code == 200, r1.text
+    page1 = r1.json()
+    assert [i["event_id"] for i in page1["items"]] == event_ids[:2]
+    assert page1["next_after_id"] == page1["items"][-1]["id"]
+
+    r2 = client.get(f"/admin/dead-letters?limit=2&after_id={page1['next_after_id']}", headers=auth_headers(token))
+    page2 = r2.json()
+    assert [i["event_id"] for i in page2["items"]] == event_ids[2:]
+    assert page2["next_after_id"] is None
+
+
+def test_replay_reenqueues_selected_dead_letters(client):
+    replay_me = _dead_letter("SOMETHING_UNKNOWN")
+    keep_me = _dead_letter("OTHER_UNKNOWN")
+    token = login_and_get_token(client, "admin", "admin")
+
+    r = client.post("/admin/dead-letters/replay", json={}, headers=auth_headers(token))
+    assert r.status_code == 400, r.text
+
+    r = client.post(
+        "/admin/dead-letters/replay",
+        json={"event_type": "SOMETHING_UNKNOWN"},
+        headers=auth_headers(token),
+    )
+    assert r.status_code == 200, r.text
+    assert r.json() == {"replayed": 1}
+
+    with get_session() as s:
+        ev = s.query(OutboxEvent).filter(OutboxEvent.event_id == replay_me).one()
+        assert ev.status == "PENDING"
+        assert ev.attempts == 0
+
+        assert s.query(OutboxEvent).filter(OutboxEvent.event_id == keep_me).count() == 0
+        assert s.query(DeadLetterEvent).filter(DeadLetterEvent.replayed_at.is_(None)).count() == 1
+
+    # already replayed: a second replay is a no-op
+    r = client.post("/admin/dead-letters/replay", json={"all": True}, headers=auth_headers(token))
+    assert r.json() == {"replayed": 1}
+    r = client.post("/admin/dead-letters/replay", json={"all": True}, headers=auth_headers(token))
+    assert r.json() == {"replayed": 0}
+
+
+def test_replay_notifies_only_when_enabled(monkeypatch):
+    _dead_letter()
+    _dead_letter()
+    notified: list[bool] = []
+    monkeypatch.setattr(dead_letter_service, "notify_outbox", lambda _session: notified.append(True))
+
+    monkeypatch.setattr(get_settings(), "OUTBOX_NOTIFY_ENABLED", False)
+    with get_session() as s:
+        assert dead_letter_service.replay_dead_letters(s, ids=[1]) == 1
+    assert notified == []
+
+    monkeypatch.setattr(get_settings(), "OUTBOX_NOTIFY_ENABLED", True)
+    with get_session() as s:
+        assert dead_letter_service.replay_dead_letters(s, ids=[2]) == 1
+    assert notified == [True]
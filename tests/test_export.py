@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.db import get_engine, get_session
+from app.models import AuditLog, NonConformity, Supplier
+from app.services.export_service import AUDIT_EXPORT_COLUMNS, audit_export_query, iter_export
+from tests.utils_auth import auth_headers, login_and_get_token
+
+
+def _seed_audit(now: datetime) -> None:
+    with get_session() as s:
+        for i, (action, entity_type, age_days) in enumerate(
+            (
+                ("NC_CREATED_HANDLED", "NonConformity", 10),
+                ("NC_CLOSED_HANDLED", "NonConformity", 5),
+                ("SUPPLIER_CERT_UPDATED_HANDLED", "Supplier", 3),
+                ("NC_CREATED_HANDLED", "NonConformity", 1),
+            )
+        ):
+            s.add(
+                AuditLog(
+                    actor="system",
+                    action=action,
+                    entity_type=entity_type,
+                    entity_id=str(i),
+                    meta_json=json.dumps({"i": i, "note": "a,b \"quoted\""}),
+                    created_at=now - timedelta(days=age_days),
+                )
+            )
+
+
+def test_audit_export_ndjson_with_filters(client):
+    now = datetime(2026, 6, 1, 12, 0, 0)
+    _seed_audit(now)
+    headers = auth_headers(login_and_get_token(client, "auditor", "auditor"))
+
+    r = client.get("/audit-log/export", headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["entity_id"] for row in rows] == ["0", "1", "2", "3"]  # oldest first
+    assert json.loads(rows[0]["meta_json"])["i"] == 0
+
+    created_from = (now - timedelta(days=6)).isoformat()
+    r = client.get(
+        f"/audit-log/export?entity_type=NonConformity&created_from={created_from}",
+        headers=headers,
+    )
+    assert [json.loads(line)["action"] for line in r.text.splitlines()] == [
+        "NC_CLOSED_HANDLED",
+        "NC_CREATED_HANDLED",
+    ]
+
+    r = client.get(
+        f"/audit-log/export?action=NC_CREATED_HANDLED&created_to={(now - timedelta(days=2)).isoformat()}",
+        headers=headers,
+    )
+    assert [json.loads(line)["entity_id"] for line in r.text.splitlines()] == ["0"]
+
+
+def test_audit_export_csv_and_rbac(client):
+    _seed_audit(datetime(2026, 6, 1))
+
+    quality = auth_headers(login_and_get_token(client, "quality", "quality"))
+    assert client.get("/audit-log/export", headers=quality).status_code == 403
+
+    headers = auth_headers(login_and_get_token(client, "admin", "admin"))
+    r = client.get("/audit-log/export?format=csv&entity_type=Supplier", headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("text/csv")
+    assert 'filename="audit_log.csv"' in r.headers["content-disposition"]
+
+    rows = list(csv.reader(io.StringIO(r.text)))
+    assert rows[0] == list(AUDIT_EXPORT_COLUMNS)
+    assert len(rows) == 2
+    assert json.loads(rows[1][5])["note"] == 'a,b "quoted"'
+
+    assert client.get("/audit-log/export?format=xml", headers=headers).status_code == 422
+
+
+def test_nc_export_streams_filtered_rows(client):
+    with get_session() as s:
+        sup = Supplier(name="ACME-export")
+        s.add(sup)
+        s.flush()
+        for i in range(5):
+            s.add(
+                NonConformity(
+                    supplier_id=sup.id,
+                    severity="high" if i % 2 == 0 else "low",
+                    status="OPEN",
+                    description=f"nc-{i}",
+                )
+            )
+
+    headers = auth_headers(login_and_get_token(client, "quality", "quality"))
+    r = client.get("/ncs/export?severity=high", headers=headers)
+    assert r.status_code == 200, r.text
+    assert [json.loads(line)["description"] for line in r.text.splitlines()] == ["nc-0", "nc-2", "nc-4"]
+
+
+def test_export_reads_through_a_server_side_cursor():
+    _seed_audit(datetime(2026, 6, 1))
+
+    cursor_names: list[str | None] = []
+
+    def _capture(_conn, cursor, *_args):
+        cursor_names.append(getattr(cursor, "name", None))
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        chunks = list(iter_export(audit_export_query(), AUDIT_EXPORT_COLUMNS, "ndjson", batch_size=3))
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    # psycopg named cursor = server-side; 4 rows fetched 3 at a time
+    assert any(cursor_names)
+    assert [chunk.count("\n") for chunk in chunks] == [3, 1]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+import pytest
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+import app.events.registry as registry
+import app.worker as worker
+
+from app.db import get_session
+from app.models import AuditLog, OutboxEvent
+
+
+def _add_event(s, event_type: str, payload: dict) -> int:
+    ev = OutboxEvent(
+        event_id=str(uuid.uuid4()),
+        event_type=event_type,
+        payload_json=json.dumps(payload),
+        status="PENDING",
+        attempts=0,
+    )
+    s.add(ev)
+    s.flush()
+    return ev.id
+
+
+@pytest.fixture
+def test_handler(monkeypatch):
+    """Register a batch handler for TEST_BATCH that records its calls; fails on {"bad": true}."""
+    monkeypatch.setattr(registry, "_REGISTRY", dict(registry._REGISTRY))
+    calls: list[list[dict]] = []
+
+    @registry.event_handler("TEST_BATCH")
+    def handle_test_batch(session, payloads):
+        calls.append(payloads)
+        if any(p.get("bad") for p in payloads):
+            raise RuntimeError("bad payload")
+
+    return calls
+
+
+def test_registry_rejects_duplicates_and_unknown_types():
+    assert {"NC_CREATED", "NC_CLOSED", "SUPPLIER_CERT_UPDATED"} <= registry.registered_event_types()
+
+    with pytest.raises(ValueError):
+        registry.event_handler("NC_CREATED")(lambda session, payloads: None)
+
+    with pytest.raises(ValueError):
+        registry.get_handler("SOMETHING_UNKNOWN")
+
+
+def test_single_tx_batch_calls_each_handler_once(test_handler):
+    with get_session() as s:
+        for i in range(3):
+            _add_event(s, "TEST_BATCH", {"n": i})
+        for nc_id in (1, 2):
+            _add_event(s, "NC_CREATED", {"nc_id": nc_id})
+
+    assert worker.run_once(single_tx=True) == 5
+
+    assert [[p["n"] for p in call] for call in test_handler] == [[0, 1, 2]]
+    with get_session() as s:
+        assert s.query(AuditLog).filter(AuditLog.action == "NC_CREATED_HANDLED").count() == 2
+
+
+def test_failing_batch_falls_back_to_per_event(test_handler):
+    with get_session() as s:
+        ok_1 = _add_event(s, "TEST_BATCH", {"n": 1})
+        bad = _add_event(s, "TEST_BATCH", {"n": 2, "bad": True})
+        ok_2 = _add_event(s, "TEST_BATCH", {"n": 3})
+
+    assert worker.run_once(single_tx=True) == 2
+
+    # one failed group call, then one call per event
+    assert [len(call) for call in test_handler] == [3, 1, 1, 1]
+    with get_session() as s:
+        assert s.get(OutboxEvent, ok_1).status == "DONE"
+        assert s.get(OutboxEvent, ok_2).status == "DONE"
+        assert s.get(OutboxEvent, bad).status == "PENDING"
+
+
+def test_payload_gets_request_id_from_meta():
+    with get_session() as s:
+        ev_id = _add_event(s, "NC_CREATED", {"nc_id": 1})
+        s.get(OutboxEvent, ev_id).meta_json = json.dumps({"request_id": "rid-from-meta"})
+
+    with get_session() as s:
+        assert worker.decode_payload(s.get(OutboxEvent, ev_id)) == {"nc_id": 1, "request_id": "rid-from-meta"}
+
+
+def test_grouped_batch_span_links_each_event_trace(test_handler, monkeypatch):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(worker.trace, "get_tracer", provider.get_tracer)
+
+    trace_ids = ["0af7651916cd43dd8448eb211c80319c", "4bf92f3577b34da6a3ce929d0e0e4736"]
+    with get_session() as s:
+        for i, trace_id in enumerate(trace_ids):
+            s.add(
+                OutboxEvent(
+                    event_id=str(uuid.uuid4()),
+                    event_type="TEST_BATCH",
+                    payload_json=json.dumps({"i": i}),
+                    meta_json=json.dumps({"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"}),
+                    status="PENDING",
+                    attempts=0,
+                )
+            )
+        _add_event(s, "TEST_BATCH", {"i": 2})  # no traceparent: no link
+
+    assert worker.run_once(single_tx=True) == 3
+    assert len(test_handler) == 1
+
+    (span,) = [sp for sp in exporter.get_finished_spans() if sp.name == "worker.process_batch"]
+    assert [format(link.context.trace_id, "032x") for link in span.links] == trace_ids
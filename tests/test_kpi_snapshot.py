@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+
+from sqlalchemy import event
+
+import app.worker as worker
+
+from app.db import get_session
+from app.events.kpi_snapshot import SNAPSHOT_ID, compute_kpi_counters, utcnow
+from app.events.projections import projection_buffer, projection_scope
+from app.events.supplier_stats import cert_expired, rebuild_supplier_stats
+from app.models import KpiSnapshot, Supplier
+from app.services.kpi_service import compute_kpi
+from app.services.nc_service import close_nc, create_nc
+from app.services.supplier_service import create_supplier, get_supplier_details, update_supplier_certification
+
+
+def _kpi() -> dict:
+    with get_session() as s:
+        return compute_kpi(s)
+
+
+def _assert_matches_recompute(kpi: dict) -> None:
+    with get_session() as s:
+        counters = compute_kpi_counters(s, date.today())
+    assert {k: kpi[k] for k in counters} == counters
+
+
+def test_handlers_keep_kpi_snapshot_in_step():
+    assert _kpi()["nc_open"] == 0  # builds the row
+
+    with get_session() as s:
+        sup = Supplier(name="ACME-kpi", certification_expiry=date(2999, 12, 31))
+        s.add(sup)
+        s.flush()
+        supplier_id = sup.id
+        high_id = create_nc(s, supplier_id, "high", "a").id
+        create_nc(s, supplier_id, "low", "b")
+
+    assert worker.run_once(single_tx=True) == 2
+    kpi = _kpi()
+    assert (kpi["nc_open"], kpi["nc_open_high"], kpi["suppliers_at_risk"], kpi["audit_events_total"]) == (2, 1, 1, 2)
+    _assert_matches_recompute(kpi)
+
+    with get_session() as s:
+        close_nc(s, high_id)
+    assert worker.run_once() == 1
+    kpi = _kpi()
+    assert (kpi["nc_open"], kpi["nc_closed"], kpi["suppliers_at_risk"]) == (1, 1, 0)
+    _assert_matches_recompute(kpi)
+
+    # certification expiry moves the supplier in and out of "at risk"
+    with get_session() as s:
+        update_supplier_certification(s, supplier_id, date(2000, 1, 1))
+    assert worker.run_once() == 1
+    assert _kpi()["suppliers_at_risk"] == 1
+
+    with get_session() as s:
+        update_supplier_certification(s, supplier_id, date(2999, 12, 31))
+    assert worker.run_once() == 1
+    kpi = _kpi()
+    assert kpi["suppliers_at_risk"] == 0
+    _assert_matches_recompute(kpi)
+
+
+def test_stale_snapshot_is_rebuilt_on_first_read_of_the_day():
+    yesterday = date.today() - timedelta(days=1)
+    with get_session() as s:
+        s.add(Supplier(name="ACME-expiring", certification_expiry=yesterday))
+        s.flush()
+        rebuild_supplier_stats(s)  # direct insert: no event
+        s.add(
+            KpiSnapshot(
+                id=SNAPSHOT_ID,
+                nc_open=42,
+                suppliers_at_risk=0,
+                as_of_date=yesterday,
+                refreshed_at=utcnow(),
+            )
+        )
+
+    kpi = _kpi()
+    assert kpi["nc_open"] == 0
+    assert kpi["suppliers_at_risk"] == 1
+
+    with get_session() as s:
+        assert s.get(KpiSnapshot, SNAPSHOT_ID).as_of_date == date.today()
+
+
+def test_nc_and_cert_events_agree_on_at_risk_whatever_the_db_state():
+    _kpi()
+    with get_session() as s:
+        sup = Supplier(name="ACME-kpi-order", certification_expiry=date(2999, 12, 31))
+        s.add(sup)
+        s.flush()
+        rebuild_supplier_stats(s)
+        supplier_id = sup.id
+        nc_id = create_nc(s, supplier_id, "high", "a").id
+        # committed with the NC: the NC event is handled while the DB already has the new expiry
+        update_supplier_certification(s, supplier_id, date(2000, 1, 1))
+
+    assert worker.run_once(limit=1) == 1  # NC_CREATED
+    assert _kpi()["suppliers_at_risk"] == 1
+    assert worker.run_once(limit=1) == 1  # SUPPLIER_CERT_UPDATED
+    assert _kpi()["suppliers_at_risk"] == 1
+
+    with get_session() as s:
+        close_nc(s, nc_id)
+        update_supplier_certification(s, supplier_id, date(2999, 12, 31))
+    assert worker.run_once(limit=1) == 1  # NC_CLOSED: the handled certification is still expired
+    assert _kpi()["suppliers_at_risk"] == 1
+    assert worker.run_once(limit=1) == 1
+    kpi = _kpi()
+    assert kpi["suppliers_at_risk"] == 0
+    _assert_matches_recompute(kpi)
+
+
+def test_supplier_created_expired_is_at_risk_right_away():
+    _kpi()
+    with get_session() as s:
+        expired = create_supplier(s, "ACME-created-expired", date(2000, 1, 1)).id
+        create_supplier(s, "ACME-created-valid", date(2999, 12, 31))
+
+    # no event to wait for: applied with the insert
+    kpi = _kpi()
+    assert kpi["suppliers_at_risk"] == 1
+    _assert_matches_recompute(kpi)
+    with get_session() as s:
+        assert get_supplier_details(s, [expired])[0]["is_at_risk"] is True
+
+
+def test_fresh_snapshot_is_read_with_one_statement(engine):
+    _kpi()  # builds the row
+
+    statements: list[str] = []
+
+    def _count(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        _kpi()
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert len(statements) == 1
+    assert "kpi_snapshot" in statements[0]
+
+
+def test_at_risk_predicate_is_shared_by_kpi_and_supplier_detail():
+    expired = date.today() - timedelta(days=1)
+    with get_session() as s:
+        suppliers = [
+            Supplier(name="kpi-expired", certification_expiry=expired),
+            Supplier(name="kpi-soon", certification_expiry=date.today()),  # expires at end of today
+            Supplier(name="kpi-high", certification_expiry=None),
+            Supplier(name="kpi-clean", certification_expiry=date(2999, 12, 31)),
+        ]
+        s.add_all(suppliers)
+        s.flush()
+        ids = [sup.id for sup in suppliers]
+        create_nc(s, ids[0], "high", "a")
+        create_nc(s, ids[2], "high", "b")
+        create_nc(s, ids[3], "low", "c")
+
+    assert worker.run_once(single_tx=True) == 3
+
+    with get_session() as s:
+        rebuild_supplier_stats(s)  # direct inserts: copy the certifications into supplier_stats
+        counters = compute_kpi_counters(s, date.today())
+        details = get_supplier_details(s, ids)
+
+    assert counters["suppliers_at_risk"] == 2
+    assert [d["is_at_risk"] for d in details] == [True, False, True, False]
+
+
+def test_cert_expired_accepts_payload_strings():
+    today = date(2026, 6, 1)
+    assert cert_expired(date(2026, 5, 31), today) is True
+    assert cert_expired("2026-05-31", today) is True
+    assert cert_expired("2026-06-01", today) is False
+    # events enqueued before the DATE column could carry anything
+    assert cert_expired("", today) is False
+    assert cert_expired("n/a", today) is False
+    assert cert_expired(None, today) is False
+
+
+def test_batch_applies_kpi_delta_once_right_before_commit(engine):
+    _kpi()  # builds the row
+    with get_session() as s:
+        sup = Supplier(name="ACME-kpi-batch", certification_expiry=date(2999, 12, 31))
+        other = Supplier(name="ACME-kpi-batch-cert", certification_expiry=date(2999, 12, 31))
+        s.add_all([sup, other])
+        s.flush()
+        create_nc(s, sup.id, "high", "a")
+        create_nc(s, sup.id, "low", "b")
+        update_supplier_certification(s, other.id, date(2000, 1, 1))
+
+    statements: list[str] = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        # NC_CREATED group + SUPPLIER_CERT_UPDATED group (different partitions) in one transaction
+        assert worker.run_once(single_tx=True) == 3
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    kpi_updates = [i for i, st in enumerate(statements) if st.startswith("UPDATE kpi_snapshot")]
+    assert kpi_updates == [len(statements) - 1]
+    # both suppliers locked by one upsert, then one executemany UPDATE
+    assert sum(st.startswith("INSERT INTO supplier_stats") for st in statements) == 1
+    assert sum(st.startswith("UPDATE supplier_stats") for st in statements) == 1
+
+    kpi = _kpi()
+    assert (kpi["nc_open"], kpi["suppliers_at_risk"], kpi["audit_events_total"]) == (2, 2, 3)
+    _assert_matches_recompute(kpi)
+
+
+def test_rolled_back_deltas_are_dropped():
+    _kpi()
+
+    with get_session() as s:
+        projection_buffer(s).audit_events += 1
+        with pytest.raises(RuntimeError), projection_scope(s):
+            projection_buffer(s).audit_events += 10
+            raise RuntimeError("handler failed")
+        with projection_scope(s):
+            projection_buffer(s).audit_events += 2
+
+    with pytest.raises(RuntimeError), get_session() as s:
+        projection_buffer(s).audit_events += 100
+        raise RuntimeError("transaction rolled back")
+
+    with get_session() as s:
+        assert s.get(KpiSnapshot, SNAPSHOT_ID).audit_events_total == 3
@@ -71,3 +71,46 @@ def test_list_ncs_pagination(client):
     data2 = r_list_2.json()
     assert isinstance(data2, list)
     assert len(data2) == 1
+
+
+def test_list_suppliers_expiring_before(client):
+    headers_p = auth_headers(login_and_get_token(client, "procurement", "procurement"))
+    suppliers = (("EXP-old", "2020-01-01"), ("EXP-soon", "2030-06-30"), ("EXP-late", "2031-01-01"), ("EXP-none", None))
+    for name, expiry in suppliers:
+        r = client.post("/suppliers", json={"name": name, "certification_expiry": expiry}, headers=headers_p)
+        assert r.status_code == 201, r.text
+
+    headers_a = auth_headers(login_and_get_token(client, "auditor", "auditor"))
+    r = client.get("/suppliers?expiring_before=2030-07-01", headers=headers_a)
+    assert r.status_code == 200, r.text
+    assert [(s["name"], s["certification_expiry"]) for s in r.json()] == [
+        ("EXP-old", "2020-01-01"),
+        ("EXP-soon", "2030-06-30"),
+    ]
+
+    r_bad = client.post("/suppliers", json={"name": "EXP-bad", "certification_expiry": "2030-02-30"}, headers=headers_p)
+    assert r_bad.status_code == 422, r_bad.text
+
+
+def test_list_ncs_keyset_pagination_with_filter(client):
+    headers_p = auth_headers(login_and_get_token(client, "procurement", "procurement"))
+    r = client.post("/suppliers", json={"name": "ACME-keyset", "certification_expiry": None}, headers=headers_p)
+    supplier_id = r.json()["id"]
+
+    headers_q = auth_headers(login_and_get_token(client, "quality", "quality"))
+    for i in range(5):
+        severity = "high" if i % 2 == 0 else "low"
+        r = client.post(
+            "/ncs",
+            json={"supplier_id": supplier_id, "severity": severity, "description": f"nc-{i}"},
+            headers=headers_q,
+        )
+        assert r.status_code == 201, r.text
+
+    r1 = client.get("/ncs?severity=high&limit=2", headers=headers_q)
+    assert [n["description"] for n in r1.json()] == ["nc-0", "nc-2"]
+    after_id = r1.headers["X-Next-After-Id"]
+
+    r2 = client.get(f"/ncs?severity=high&limit=2&after_id={after_id}", headers=headers_q)
+    assert [n["description"] for n in r2.json()] == ["nc-4"]
+    assert "X-Next-After-Id" not in r2.headers
@@ -66,4 +66,86 @@ def test_reclaim_stale_lock_postgres():
         ev = s.get(OutboxEvent, 1)
         assert ev is not None
         assert ev.status == "PROCESSING"
-        assert ev.locked_by == "w2"
\ No newline at end of file
+        assert ev.locked_by == "w2"
+
+def test_claim_merges_pending_and_stale_branches_by_id_postgres():
+    # Arrange: id=1 stale PROCESSING, id=2..4 PENDING, id=5 DONE
+    with app_db.SessionLocal() as s:
+        s.add_all(
+            [
+                OutboxEvent(
+                    event_id="e1",
+                    event_type="NC_CREATED",
+                    payload_json="{}",
+                    status="PROCESSING",
+                    locked_by="dead",
+                    locked_at=_utcnow() - timedelta(seconds=999),
+                ),
+                OutboxEvent(event_id="e2", event_type="NC_CREATED", payload_json="{}"),
+                OutboxEvent(event_id="e3", event_type="NC_CREATED", payload_json="{}"),
+                OutboxEvent(event_id="e4", event_type="NC_CREATED", payload_json="{}"),
+                OutboxEvent(event_id="e5", event_type="NC_CREATED", payload_json="{}", status="DONE"),
+            ]
+        )
+        s.commit()
+
+    with app_db.SessionLocal() as s:
+        ids = claim_outbox_ids(s, limit=2, worker_id="w1", lock_timeout_sec=30)
+        s.commit()
+
+    assert ids == [1, 2]
+
+
+def test_claim_takes_fresh_and_due_retry_rows_skips_backed_off_postgres():
+    # id=1 still backing off, id=2 retry due, id=3 never attempted
+    with app_db.SessionLocal() as s:
+        s.add_all(
+            [
+                OutboxEvent(
+                    event_id="e1",
+                    event_type="NC_CREATED",
+                    payload_json="{}",
+                    attempts=1,
+                    next_attempt_at=_utcnow() + timedelta(seconds=999),
+                ),
+                OutboxEvent(
+                    event_id="e2",
+                    event_type="NC_CREATED",
+                    payload_json="{}",
+                    attempts=1,
+                    next_attempt_at=_utcnow() - timedelta(seconds=1),
+                ),
+                OutboxEvent(event_id="e3", event_type="NC_CREATED", payload_json="{}"),
+            ]
+        )
+        s.commit()
+
+    with app_db.SessionLocal() as s:
+        ids = claim_outbox_ids(s, limit=10, worker_id="w1", lock_timeout_sec=30)
+        s.commit()
+
+    assert ids == [2, 3]
+
+
+def test_concurrent_claims_skip_rows_locked_by_open_transaction_postgres():
+    with app_db.SessionLocal() as s:
+        s.add_all(
+            [OutboxEvent(event_id=f"e{i}", event_type="NC_CREATED", payload_json="{}") for i in range(1, 5)]
+        )
+        s.commit()
+
+    # w1 claims but keeps its transaction open (single-tx batch mode)
+    s1 = app_db.SessionLocal()
+    try:
+        ids1 = claim_outbox_ids(s1, limit=2, worker_id="w1", lock_timeout_sec=30)
+
+        with app_db.SessionLocal() as s2:
+            ids2 = claim_outbox_ids(s2, limit=2, worker_id="w2", lock_timeout_sec=30)
+            s2.commit()
+
+        s1.commit()
+    finally:
+        s1.close()
+
+    assert ids1 == [1, 2]
+    assert ids2 == [3, 4]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app.db import get_session
+from app.models import OutboxEvent
+from app.observability.outbox_health import sample_outbox_health
+
+
+def _add(s, event_id: str, status: str, age_sec: int) -> None:
+    s.add(
+        OutboxEvent(
+            event_id=event_id,
+            event_type="NC_CREATED",
+            payload_json="{}",
+            status=status,
+            attempts=0,
+            created_at=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=age_sec),
+        )
+    )
+
+
+def test_health_counts_only_unprocessed_and_reports_oldest_age():
+    with get_session() as s:
+        _add(s, "e1", "PENDING", 60)
+        _add(s, "e2", "PROCESSING", 30)
+        _add(s, "e3", "DONE", 3600)
+        _add(s, "e4", "FAILED", 7200)
+
+    with get_session() as s:
+        count, age = sample_outbox_health(s)
+
+    assert count == 2
+    assert 55 <= age < 120
+
+
+def test_health_empty_outbox():
+    with get_session() as s:
+        assert sample_outbox_health(s) == (0, 0.0)
+
+
+def test_health_estimate_mode_falls_back_to_exact_below_threshold():
+    with get_session() as s:
+        _add(s, "e1", "PENDING", 5)
+
+    with get_session() as s:
+        count, _ = sample_outbox_health(s, estimate_above=1_000_000)
+
+    assert count == 1
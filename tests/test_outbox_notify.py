@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from app.db import get_session
+from app.events.notify import OutboxListener
+from app.events.outbox import enqueue_event
+
+
+def test_enqueue_event_notifies_listener_only_on_commit():
+    listener = OutboxListener.from_settings().connect()
+    try:
+        assert listener.wait(0.05) is False
+
+        with get_session() as s:
+            enqueue_event(s, event_type="NC_CREATED", payload={"nc_id": 1})
+            s.flush()
+            # not delivered until commit
+            assert listener.wait(0.05) is False
+
+        assert listener.wait(5.0) is True
+        # drained: no leftover wakeups
+        assert listener.wait(0.05) is False
+    finally:
+        listener.close()
+
+
+def test_rolled_back_enqueue_does_not_notify():
+    listener = OutboxListener.from_settings().connect()
+    try:
+        try:
+            with get_session() as s:
+                enqueue_event(s, event_type="NC_CREATED", payload={"nc_id": 1})
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        assert listener.wait(0.2) is False
+    finally:
+        listener.close()
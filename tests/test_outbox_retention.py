@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.db import get_session
+from app.events.retention import run_retention
+from app.models import OutboxEvent, OutboxEventArchive, ProcessedEvent
+from app.settings import get_settings
+
+
+def _naive_utc(days_ago: int) -> datetime:
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).replace(tzinfo=None)
+
+
+def _add_event(s, event_id: str, status: str, days_ago: int) -> None:
+    s.add(
+        OutboxEvent(
+            event_id=event_id,
+            event_type="NC_CREATED",
+            payload_json="{}",
+            status=status,
+            attempts=1,
+            created_at=_naive_utc(days_ago),
+        )
+    )
+
+
+def test_retention_archives_old_done_events_in_batches():
+    with get_session() as s:
+        for i in range(5):
+            _add_event(s, f"old-{i}", "DONE", 10)
+        _add_event(s, "recent", "DONE", 1)
+        _add_event(s, "old-pending", "PENDING", 10)
+        _add_event(s, "old-failed", "FAILED", 10)
+
+    settings = get_settings().model_copy(update={"OUTBOX_RETENTION_DAYS": 7, "RETENTION_BATCH_SIZE": 2})
+    totals = run_retention(settings)
+
+    assert totals["archived"] == 5
+
+    with get_session() as s:
+        remaining = {ev.event_id for ev in s.query(OutboxEvent).all()}
+        assert remaining == {"recent", "old-pending", "old-failed"}
+
+        archived = s.query(OutboxEventArchive).order_by(OutboxEventArchive.id).all()
+        assert [a.event_id for a in archived] == [f"old-{i}" for i in range(5)]
+        assert all(a.status == "DONE" and a.archived_at is not None for a in archived)
+
+
+def test_retention_prunes_processed_events_only_outside_hot_outbox():
+    with get_session() as s:
+        _add_event(s, "still-live", "PENDING", 1)
+        s.add(ProcessedEvent(event_id="still-live", processed_at=_naive_utc(60)))
+        s.add(ProcessedEvent(event_id="archived-long-ago", processed_at=_naive_utc(60)))
+        s.add(ProcessedEvent(event_id="recent", processed_at=_naive_utc(1)))
+
+    settings = get_settings().model_copy(
+        update={"OUTBOX_RETENTION_DAYS": 7, "PROCESSED_EVENTS_RETENTION_DAYS": 30}
+    )
+    totals = run_retention(settings)
+
+    assert totals["processed_pruned"] == 1
+
+    with get_session() as s:
+        kept = {pe.event_id for pe in s.query(ProcessedEvent).all()}
+        assert kept == {"still-live", "recent"}
+
+
+def test_retention_logs_archived_and_pruned_counts(caplog):
+    with get_session() as s:
+        _add_event(s, "old-done", "DONE", 10)
+        s.add(ProcessedEvent(event_id="archived-long-ago", processed_at=_naive_utc(60)))
+        s.add(ProcessedEvent(event_id="archived-long-ago-2", processed_at=_naive_utc(60)))
+
+    settings = get_settings().model_copy(
+        update={"OUTBOX_RETENTION_DAYS": 7, "PROCESSED_EVENTS_RETENTION_DAYS": 30}
+    )
+    with caplog.at_level(logging.INFO, logger="qhse.outbox.retention"):
+        run_retention(settings)
+
+    (record,) = [r for r in caplog.records if getattr(r, "status", None) == "done"]
+    assert (record.archived, record.processed_pruned) == (1, 2)
+    assert record.getMessage() == "outbox retention done: outbox archived=1 processed_events pruned=2"
+
+
+def test_archive_keeps_every_outbox_column():
+    outbox_columns = {c.name for c in OutboxEvent.__table__.columns}
+    archive_columns = {c.name for c in OutboxEventArchive.__table__.columns} - {"archived_at"}
+    assert archive_columns == outbox_columns
+
+    with get_session() as s:
+        s.add(
+            OutboxEvent(
+                event_id="retried",
+                event_type="NC_CREATED",
+                payload_json='{"nc_id": 7}',
+                status="DONE",
+                attempts=2,
+                partition_key="nc:7",
+                error_history_json='[{"error": "boom"}]',
+                next_attempt_at=_naive_utc(9),
+                created_at=_naive_utc(10),
+            )
+        )
+
+    run_retention(get_settings().model_copy(update={"OUTBOX_RETENTION_DAYS": 7}))
+
+    with get_session() as s:
+        archived = s.query(OutboxEventArchive).one()
+        assert archived.partition_key == "nc:7"
+        assert archived.error_history_json == '[{"error": "boom"}]'
+        assert archived.next_attempt_at is not None
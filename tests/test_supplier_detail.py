@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from app.db import get_engine, get_session
+from app.events.supplier_stats import rebuild_supplier_stats
+from app.models import NonConformity, Supplier
+from app.services.supplier_service import get_supplier_detail, get_supplier_details, update_supplier_certification
+from tests.utils_auth import auth_headers, login_and_get_token
+
+
+def _seed() -> tuple[int, int, int]:
+    expired = date.today() - timedelta(days=1)
+    with get_session() as s:
+        risky = Supplier(name="risky", certification_expiry=None)
+        expired_sup = Supplier(name="expired", certification_expiry=expired)
+        clean = Supplier(name="clean", certification_expiry=date(2999, 1, 1))
+        s.add_all([risky, expired_sup, clean])
+        s.flush()
+
+        for severity, status in (("high", "OPEN"), ("high", "CLOSED"), ("low", "OPEN")):
+            s.add(NonConformity(supplier_id=risky.id, severity=severity, status=status, description="x"))
+        s.add(NonConformity(supplier_id=clean.id, severity="low", status="CLOSED", description="x"))
+        s.flush()
+
+        # NCs inserted directly (no events): build the counters the handlers would maintain
+        rebuild_supplier_stats(s)
+
+        return risky.id, expired_sup.id, clean.id
+
+
+def test_supplier_detail_counts_in_one_statement():
+    risky_id, expired_id, clean_id = _seed()
+
+    statements: list[str] = []
+
+    def _count(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        with get_session() as s:
+            detail = get_supplier_detail(s, risky_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert len(statements) == 1
+    assert "supplier_stats" in statements[0]
+    assert detail == {
+        "id": risky_id,
+        "name": "risky",
+        "certification_expiry": None,
+        "nc_total": 3,
+        "nc_open": 2,
+        "nc_open_high": 1,
+        "is_at_risk": True,
+    }
+
+    with get_session() as s:
+        details = get_supplier_details(s, [clean_id, expired_id, 999999, clean_id])
+
+    assert [(d["id"], d["nc_total"], d["is_at_risk"]) for d in details] == [
+        (expired_id, 0, True),
+        (clean_id, 1, False),
+    ]
+
+
+def test_supplier_details_endpoint(client):
+    risky_id, _expired_id, clean_id = _seed()
+    headers = auth_headers(login_and_get_token(client, "procurement", "procurement"))
+
+    r = client.get(f"/suppliers/details?ids={risky_id}&ids={clean_id}", headers=headers)
+    assert r.status_code == 200, r.text
+    assert [(d["id"], d["is_at_risk"]) for d in r.json()] == [(risky_id, True), (clean_id, False)]
+
+    r = client.get("/suppliers/details", headers=headers)
+    assert r.status_code == 422, r.text
+
+
+def test_is_at_risk_follows_the_returned_certification():
+    _, _, clean_id = _seed()
+
+    # certification update committed, its event not handled yet
+    with get_session() as s:
+        update_supplier_certification(s, clean_id, date(2000, 1, 1))
+        detail = get_supplier_detail(s, clean_id)
+
+    assert detail["certification_expiry"] == date(2000, 1, 1)
+    assert detail["is_at_risk"] is True
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from app.worker import AdaptiveBatchController, BatchResult
+
+
+def _controller(**kw) -> AdaptiveBatchController:
+    params = dict(
+        initial=10,
+        min_size=2,
+        max_size=40,
+        target_job_sec=0.5,
+        idle_min_sec=1.0,
+        idle_max_sec=8.0,
+    )
+    params.update(kw)
+    return AdaptiveBatchController(**params)
+
+
+def test_full_fast_batches_grow_size_without_waiting():
+    c = _controller()
+
+    assert c.observe(BatchResult(claimed=10, processed=10, duration_sec=0.1)) == 0
+    assert c.batch_size == 20
+
+    assert c.observe(BatchResult(claimed=20, processed=20, duration_sec=0.1)) == 0
+    assert c.observe(BatchResult(claimed=40, processed=40, duration_sec=0.1)) == 0
+    assert c.batch_size == 40  # capped at max_size
+
+
+def test_slow_jobs_shrink_size():
+    c = _controller()
+
+    # 10 jobs in 10s -> 1s/job > target 0.5s
+    c.observe(BatchResult(claimed=10, processed=10, duration_sec=10.0))
+    assert c.batch_size == 5
+
+    c.observe(BatchResult(claimed=5, processed=5, duration_sec=10.0))
+    c.observe(BatchResult(claimed=2, processed=2, duration_sec=10.0))
+    assert c.batch_size == 2  # floored at min_size
+
+
+def test_empty_polls_back_off_exponentially_and_reset_on_work():
+    c = _controller()
+
+    waits = [c.observe(BatchResult(claimed=0, processed=0, duration_sec=0.01)) for _ in range(5)]
+    assert waits == [1.0, 2.0, 4.0, 8.0, 8.0]
+
+    # partial batch: backlog drained -> minimum idle
+    assert c.observe(BatchResult(claimed=3, processed=3, duration_sec=0.01)) == 1.0
+    assert c.batch_size == 10
+
+    # full batch: backlog -> no wait
+    assert c.observe(BatchResult(claimed=10, processed=9, duration_sec=0.01)) == 0
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+import app.worker as worker
+
+from app.db import get_session
+from app.models import AuditLog, OutboxEvent, ProcessedEvent
+
+
+def _add_event(s, event_type: str, payload: dict) -> int:
+    ev = OutboxEvent(
+        event_id=str(uuid.uuid4()),
+        event_type=event_type,
+        payload_json=json.dumps(payload),
+        status="PENDING",
+        attempts=0,
+    )
+    s.add(ev)
+    s.flush()
+    return ev.id
+
+
+def test_single_tx_batch_isolates_failing_event():
+    # Arrange: good, poison, good -> all in the same claimed batch
+    with get_session() as s:
+        ok_1 = _add_event(s, "NC_CREATED", {"nc_id": 1})
+        bad = _add_event(s, "SOMETHING_UNKNOWN", {})
+        ok_2 = _add_event(s, "NC_CLOSED", {"nc_id": 1})
+
+    # Act
+    processed = worker.run_once(single_tx=True)
+
+    # Assert: the poison event only rolled back itself
+    assert processed == 2
+
+    with get_session() as s:
+        assert s.get(OutboxEvent, ok_1).status == "DONE"
+        assert s.get(OutboxEvent, ok_2).status == "DONE"
+
+        ev_bad = s.get(OutboxEvent, bad)
+        assert ev_bad.status == "PENDING"
+        assert ev_bad.attempts == 1
+        assert ev_bad.locked_by is None
+
+        assert s.query(ProcessedEvent).count() == 2
+        assert s.query(AuditLog).count() == 2
+
+
+def test_single_tx_batch_is_idempotent_on_rerun():
+    with get_session() as s:
+        _add_event(s, "NC_CREATED", {"nc_id": 1})
+
+    assert worker.run_once(single_tx=True) == 1
+    assert worker.run_once(single_tx=True) == 0
+
+    with get_session() as s:
+        assert s.query(ProcessedEvent).count() == 1
+        assert s.query(AuditLog).count() == 1
+
+
+def test_single_tx_batch_skips_events_already_in_processed_events():
+    with get_session() as s:
+        ev_id = _add_event(s, "NC_CREATED", {"nc_id": 1})
+        event_uuid = s.get(OutboxEvent, ev_id).event_id
+        s.add(ProcessedEvent(event_id=event_uuid))
+
+    assert worker.run_once(single_tx=True) == 1
+
+    with get_session() as s:
+        assert s.get(OutboxEvent, ev_id).status == "DONE"
+        assert s.query(ProcessedEvent).count() == 1
+        assert s.query(AuditLog).count() == 0
+
+
+def test_bulk_idempotency_helpers():
+    with get_session() as s:
+        s.add(ProcessedEvent(event_id="e1"))
+
+    with get_session() as s:
+        assert worker.fetch_processed_event_ids(s, ["e1", "e2", "e3"]) == {"e1"}
+        assert worker.fetch_processed_event_ids(s, []) == set()
+
+        # conflict on e1 is ignored, duplicates in input are collapsed
+        worker.mark_processed_bulk(s, ["e1", "e2", "e3", "e3"])
+
+    with get_session() as s:
+        assert worker.fetch_processed_event_ids(s, ["e1", "e2", "e3"]) == {"e1", "e2", "e3"}
+        assert s.query(ProcessedEvent).count() == 3
@@ -1,12 +1,25 @@
 # tests/test_worker_failure_policy.py
 from __future__ import annotations
 
+import json
 import uuid
 
+from datetime import date, datetime, timezone
+
+import pytest
+
+import app.events.handlers as handlers
 import app.worker as worker
 
 from app.db import get_session
-from app.models import OutboxEvent, ProcessedEvent
+from app.models import AuditLog, DeadLetterEvent, OutboxEvent, ProcessedEvent, Supplier, SupplierStats
+
+
+def _make_retry_due(outbox_row_id: int) -> None:
+    with get_session() as s:
+        ev = s.get(OutboxEvent, outbox_row_id)
+        if ev is not None:
+            ev.next_attempt_at = None
 
 
 def test_worker_retries_unknown_event_and_does_not_mark_processed(client):
@@ -35,6 +48,9 @@ def test_worker_retries_unknown_event_and_does_not_mark_processed(client):
         assert ev2 is not None
         assert ev2.status == "PENDING"
         assert ev2.attempts == 1
+        # retry is scheduled in the future (backoff), not immediately
+        assert ev2.next_attempt_at is not None
+        assert ev2.next_attempt_at > datetime.now(timezone.utc).replace(tzinfo=None)
 
         # Must NOT mark as processed if it failed
         assert s.query(ProcessedEvent).filter(ProcessedEvent.event_id == event_uuid).count() == 0
@@ -55,15 +71,96 @@ def test_worker_marks_unknown_event_failed_after_5_attempts(client):
         s.flush()
         outbox_row_id = ev.id
 
-    # Act: run 5 times -> attempts reaches 5 -> status FAILED
+    # Act: run 5 times -> attempts reaches 5 -> moved to the dead-letter store
     for _ in range(5):
         processed = worker.run_once()
         assert processed == 0  # unknown event never succeeds
 
+        # backoff: not claimable again until its retry time has come
+        assert worker.run_once() == 0
+        _make_retry_due(outbox_row_id)
+
     # Assert
     with get_session() as s:
-        ev2 = s.get(OutboxEvent, outbox_row_id)
-        assert ev2 is not None
-        assert ev2.attempts == 5
-        assert ev2.status == "FAILED"
+        assert s.get(OutboxEvent, outbox_row_id) is None
+
+        dl = s.query(DeadLetterEvent).filter(DeadLetterEvent.event_id == event_uuid).one()
+        assert dl.outbox_id == outbox_row_id
+        assert dl.attempts == 5
+        assert dl.replayed_at is None
+        assert dl.traceback_digest and len(dl.traceback_digest) == 64
+        assert len(json.loads(dl.attempt_history_json)) == 5
         assert s.query(ProcessedEvent).filter(ProcessedEvent.event_id == event_uuid).count() == 0
+
+
+def _insert_event(event_type: str, payload: dict) -> int:
+    with get_session() as s:
+        ev = OutboxEvent(
+            event_id=str(uuid.uuid4()),
+            event_type=event_type,
+            payload_json=json.dumps(payload),
+            status="PENDING",
+            attempts=0,
+        )
+        s.add(ev)
+        s.flush()
+        return ev.id
+
+
+def test_poison_payload_leaves_no_audit_rows_behind(client):
+    outbox_row_id = _insert_event("NC_CREATED", {"nc_id": "abc"})
+
+    for _ in range(5):
+        assert worker.run_once() == 0
+        _make_retry_due(outbox_row_id)
+
+    with get_session() as s:
+        assert s.get(OutboxEvent, outbox_row_id) is None
+        assert s.query(DeadLetterEvent).count() == 1
+        assert s.query(AuditLog).count() == 0
+
+
+@pytest.mark.parametrize("single_tx", [False, True])
+def test_failure_after_audit_write_rolls_the_audit_rows_back(client, monkeypatch, single_tx):
+    def _write_then_fail(*args, **kwargs):
+        write_audit_rows(*args, **kwargs)
+        raise RuntimeError("handler failed after writing audit rows")
+
+    write_audit_rows = handlers.write_audit_rows
+    monkeypatch.setattr(handlers, "write_audit_rows", _write_then_fail)
+    outbox_row_id = _insert_event("NC_CREATED", {"nc_id": 1})
+
+    assert worker.run_once(single_tx=single_tx) == 0
+
+    with get_session() as s:
+        assert s.get(OutboxEvent, outbox_row_id).attempts == 1
+        assert s.query(AuditLog).count() == 0
+
+
+def test_retry_delay_grows_exponentially_with_jitter_and_cap():
+    for attempts, nominal in ((1, 2.0), (2, 4.0), (3, 8.0), (10, 60.0)):
+        d = worker.compute_retry_delay(attempts, base_sec=2.0, max_sec=60.0)
+        assert nominal / 2 <= d <= nominal
+
+    assert worker.compute_retry_delay(3, base_sec=0, max_sec=60.0) == 0.0
+
+
+@pytest.mark.parametrize("single_tx", [False, True])
+def test_event_for_unknown_supplier_goes_through_the_failure_policy(client, single_tx):
+    with get_session() as s:
+        sup = Supplier(name="ACME-cert-known")
+        s.add(sup)
+        s.flush()
+        supplier_id = sup.id
+
+    bad_id = _insert_event("SUPPLIER_CERT_UPDATED", {"supplier_id": supplier_id + 999_999, "certification_expiry": None})
+    good_id = _insert_event("SUPPLIER_CERT_UPDATED", {"supplier_id": supplier_id, "certification_expiry": "2000-01-01"})
+
+    # the supplier_stats write at commit would hit the FK: rejected inside the event's SAVEPOINT instead
+    assert worker.run_once(single_tx=single_tx) == 1
+
+    with get_session() as s:
+        bad = s.get(OutboxEvent, bad_id)
+        assert (bad.status, bad.attempts) == ("PENDING", 1)
+        assert s.get(OutboxEvent, good_id).status == "DONE"
+        assert s.get(SupplierStats, supplier_id).certification_expiry == date(2000, 1, 1)
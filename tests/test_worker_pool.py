@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+
+import app.worker as worker
+
+from app.db import get_session
+from app.models import AuditLog, OutboxEvent, ProcessedEvent
+from app.settings import get_settings
+
+
+def test_make_worker_id_is_distinct_per_slot():
+    w0 = worker.make_worker_id(0)
+    w1 = worker.make_worker_id(1)
+
+    assert w0 != w1
+    assert w0.endswith(f":{os.getpid()}:0")
+    assert len(w0) <= 64
+
+
+def test_pool_processes_each_event_once_and_drains_on_stop():
+    n_events = 30
+    with get_session() as s:
+        for i in range(n_events):
+            s.add(
+                OutboxEvent(
+                    event_id=str(uuid.uuid4()),
+                    event_type="NC_CREATED",
+                    payload_json=json.dumps({"nc_id": i}),
+                    status="PENDING",
+                    attempts=0,
+                )
+            )
+
+    settings = get_settings().model_copy(
+        update={"OUTBOX_BATCH_SIZE": 4, "OUTBOX_POLL_INTERVAL_SEC": 0.05, "OUTBOX_IDLE_MAX_SEC": 0.2}
+    )
+    stop = threading.Event()
+    pool = threading.Thread(target=worker.run_pool, args=(3, stop, settings))
+    pool.start()
+
+    try:
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            with get_session() as s:
+                if s.query(OutboxEvent).filter(OutboxEvent.status == "DONE").count() == n_events:
+                    break
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        pool.join(timeout=10)
+
+    assert not pool.is_alive()
+
+    with get_session() as s:
+        assert s.query(OutboxEvent).filter(OutboxEvent.status == "DONE").count() == n_events
+        assert s.query(ProcessedEvent).count() == n_events
+        assert s.query(AuditLog).count() == n_events